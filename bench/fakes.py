@@ -0,0 +1,134 @@
+import asyncio
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+import yaml
+
+from engine.backend import ChatResult, ToolCall
+
+DEBATES_DIR = Path(__file__).parent.parent / "debates"
+
+# Reply lengths in words, roughly what the local models produce for each prompt
+REPLY_WORDS = {"plan": 220, "think": 160, "evaluate": 180, "turn": 260, "verdict": 200}
+
+
+def load_configs() -> list[dict]:
+    return [yaml.safe_load(p.read_text(encoding="utf-8")) for p in sorted(DEBATES_DIR.glob("*.yaml"))]
+
+
+def corpus_words(configs: list[dict]) -> list[str]:
+    """Every word of persona text across the debate configs, for realistic filler."""
+    words = []
+
+    def _walk(node):
+        if isinstance(node, str):
+            words.extend(node.split())
+        elif isinstance(node, dict):
+            for v in node.values():
+                _walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                _walk(v)
+    for cfg in configs:
+        _walk(cfg)
+    return words
+
+
+class FakeBackend:
+    """In-process stand-in for Ollama with realistic reply sizes and optional latency.
+
+    Replies are drawn from the debate configs' own prose. JSON requests get a
+    well-formed score, assessment or verdict (names are taken from the prompt
+    or schema); tool-enabled calls make one search_web call before answering.
+    latency is per call; streamed replies are sent in word-sized fragments.
+    """
+
+    def __init__(self, words: list[str], latency: float = 0.0, seed: int = 0):
+        self._words = words
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _text(self, n: int) -> str:
+        start = self._rng.randrange(max(len(self._words) - n, 1))
+        return " ".join(self._words[start:start + n])
+
+    @staticmethod
+    def _kind(prompt: str) -> str:
+        p = prompt.lower()
+        if "plan" in p and "before the debate" in p:
+            return "plan"
+        if "verdict" in p or "debate is over" in p:
+            return "verdict"
+        if "privately consider this argument" in p:
+            return "evaluate"
+        if "privately" in p or "do not give your debate response" in p:
+            return "think"
+        return "turn"
+
+    def _json_reply(self, prompt: str, response_format: dict) -> str:
+        schema = (response_format.get("json_schema") or {}).get("schema") or {}
+        props = schema.get("properties", {})
+        if "winner" in props:
+            a, b = props["winner"]["enum"]
+            return json.dumps({"deliberation": self._text(150), "winner": a,
+                               "scores": {a: 8, b: 6}, "announcement": self._text(80)})
+        if "evaluation" in props:
+            return json.dumps({"evaluation": self._text(150), "score": 6,
+                               "reasoning": self._text(15)})
+        m = re.search(r'\{"winner": "([^"]+)", "scores": \{"\1": 8, "([^"]+)": 6\}\}', prompt)
+        if m:
+            return json.dumps({"winner": m.group(1), "scores": {m.group(1): 8, m.group(2): 6}})
+        return json.dumps({"score": 6, "reasoning": self._text(15)})
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        prompt = messages[-1]["content"] or ""
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+
+        if tools and messages[-1]["role"] == "user":
+            return ChatResult(tool_calls=[ToolCall(id="call_0", name="search_web",
+                                                   arguments=json.dumps({"query": self._text(5)}))],
+                              prompt_tokens=prompt_tokens, completion_tokens=20)
+        if response_format:
+            content = self._json_reply(prompt, response_format)
+        else:
+            content = self._text(REPLY_WORDS[self._kind(prompt)])
+
+        if on_delta and not tools:
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                on_delta(word if i == len(words) - 1 else word + " ")
+        return ChatResult(content=content, prompt_tokens=prompt_tokens,
+                          completion_tokens=len(content) // 4)
+
+    def list_models(self) -> list[str]:
+        return ["fake:latest"]
+
+    async def aclose(self):
+        pass
+
+
+class FakeDDGS:
+    """Drop-in for ddgs.DDGS returning canned results with an optional delay."""
+
+    delay = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query: str, max_results: int = 4):
+        if self.delay:
+            time.sleep(self.delay)
+        return [{"title": f"{query} — result {i}", "href": f"https://example.org/{i}",
+                 "body": f"Snippet {i} about {query}. " * 8}
+                for i in range(max_results)]
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from bench.fakes import FakeBackend, FakeDDGS, corpus_words, load_configs  # noqa: E402
+from engine import search  # noqa: E402
+from engine.agent_pool import make_config_picker  # noqa: E402
+from engine.agents import Agent  # noqa: E402
+from engine.backend import set_backend  # noqa: E402
+from engine.debate import run_debate_async  # noqa: E402
+from engine.events import DebateEvent, EventType  # noqa: E402
+from outputs import stats as stats_mod  # noqa: E402
+from outputs.collector import ResultCollector  # noqa: E402
+from outputs.console import TerminalOutput  # noqa: E402
+from outputs.csv_export import SummaryCsv  # noqa: E402
+from outputs.html import HtmlOutput  # noqa: E402
+from outputs.rows import RowStore  # noqa: E402
+from outputs.summary import SummaryHtml  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# (quick, full) parameter grids
+SCALES = {
+    "debate_turns":      ([6, 12], [6, 12, 24, 48]),
+    "batch":             ([(8, 1), (8, 4)], [(20, 1), (20, 4), (20, 8), (60, 8)]),
+    "html_turns":        ([12, 48], [12, 48, 96, 192]),
+    "summary_rows":      ([50, 200], [50, 200, 500, 1000]),
+    "stats_rows":        ([200, 1000], [200, 1000, 5000, 20000]),
+    "search_queries":    ([50], [50, 200]),
+}
+
+
+class _Bench:
+    def __init__(self, configs: list[dict], words: list[str], latency: float, tmp: Path):
+        self.configs = configs
+        self.words = words
+        self.latency = latency
+        self.tmp = tmp
+        self._results: dict[tuple, dict] = {}
+
+    @property
+    def results(self) -> list[dict]:
+        return list(self._results.values())
+
+    def record(self, name: str, params: dict, seconds: float, items: int, unit: str, **extra):
+        """Store a timing, keeping the fastest of repeated runs of the same case."""
+        key = (name, json.dumps(params, sort_keys=True))
+        best = self._results.get(key)
+        if best is None or seconds < best["seconds"]:
+            self._results[key] = {"name": name, "params": params, "seconds": round(seconds, 5),
+                                  "items": items, "unit": unit,
+                                  "per_item_ms": round(seconds / items * 1000, 4) if items else None,
+                                  **extra}
+
+    def report(self):
+        for r in self.results:
+            per = f"{r['per_item_ms']:.3f} ms/{r['unit']}" if r["items"] else ""
+            print(f"  {r['name']:<16} {json.dumps(r['params']):<36} {r['seconds']:>9.3f}s  {per}")
+
+    # ── Debates ─────────────────────────────────────────────────────────────
+
+    def _agents(self, config: dict, rng_seed: int):
+        random.seed(rng_seed)
+        pick = make_config_picker("fake:latest", [], web_research=config.get("web_research", False),
+                                  history=config.get("history"))
+        a = Agent(pick(config["for"], side="for"))
+        b = Agent(pick(config["against"], side="against"))
+        judge = Agent(pick(config["audience"])) if "audience" in config else None
+        return a, b, judge
+
+    async def _debate(self, config: dict, turns: int, seed: int, outputs: list):
+        a, b, judge = self._agents(config, seed)
+        await run_debate_async(a, b, config["topic"], config.get("premise"), turns, judge, outputs)
+
+    def debate_turns(self, turns: int):
+        """One debate with every output attached, scaled by turns."""
+        config = self.configs[0]
+        backend = FakeBackend(self.words, latency=self.latency)
+        set_backend(backend)
+        html = self.tmp / f"debate_{turns}.html"
+        outputs = [TerminalOutput(), HtmlOutput(str(html)), ResultCollector()]
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(self._debate(config, turns, 1, outputs))
+        elapsed = time.perf_counter() - start
+        self.record("debate", {"turns": turns}, elapsed, turns, "turn",
+                    model_calls=backend.calls, model_wait_s=round(backend.calls * self.latency, 3))
+
+    def batch(self, runs: int, concurrency: int):
+        """A multi_debate-style batch: many debates, bounded concurrency, stats outputs."""
+        backend = FakeBackend(self.words, latency=self.latency)
+        set_backend(backend)
+        run_dir = self.tmp / f"batch_{runs}_{concurrency}"
+        store = RowStore()
+        stats_outputs = [SummaryHtml(str(run_dir / "summary.html"), store=store),
+                         SummaryCsv(str(run_dir / "results.csv"), store=store)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(i: int):
+            config = self.configs[i % len(self.configs)]
+            collector = ResultCollector()
+            async with semaphore:
+                await self._debate(config, config.get("turns", 6), i,
+                                   [HtmlOutput(str(run_dir / f"run_{i:03d}.html")), collector])
+            row = {"run_num": i, "winner": collector.winner, "scores": collector.scores,
+                   "judge": collector.judge, "premise": collector.premise,
+                   "premise_upheld": collector.premise_upheld, "metrics": collector.metrics}
+            store.add(row)
+            for out in stats_outputs:
+                out.add_row(row)
+
+        async def _all():
+            await asyncio.gather(*(_one(i) for i in range(runs)))
+
+        start = time.perf_counter()
+        asyncio.run(_all())
+        for out in stats_outputs:
+            out.finalize()
+        elapsed = time.perf_counter() - start
+        self.record("batch", {"runs": runs, "concurrency": concurrency}, elapsed, runs, "run",
+                    model_calls=backend.calls)
+
+    # ── Outputs ─────────────────────────────────────────────────────────────
+
+    def _events(self, turns: int) -> list[DebateEvent]:
+        rng = random.Random(turns)
+
+        def text(n):
+            start = rng.randrange(len(self.words) - n)
+            return " ".join(self.words[start:start + n])
+        names = ["Alice", "Bob"]
+        events = [DebateEvent(EventType.HEADER, metadata={
+            "topic": "A topic", "premise": "A premise", "sides": {"Alice": "for", "Bob": "against"},
+            "participants": names, "colors": {"Alice": "cyan", "Bob": "yellow", "Judge": "magenta"},
+            "personalities": {n: text(60) for n in names}, "models": {n: "fake" for n in names},
+            "judge": {"name": "Judge", "color": "magenta", "personality": text(60),
+                      "judging_criteria": text(60), "model": "fake"},
+        })]
+        for n in names:
+            events.append(DebateEvent(EventType.PLAN, n, text(220)))
+        for t in range(turns):
+            speaker = names[t % 2]
+            events.append(DebateEvent(EventType.THINK, speaker, text(160)))
+            events.append(DebateEvent(EventType.TURN, speaker, text(260)))
+            events.append(DebateEvent(EventType.THINK, "Judge", text(180)))
+            events.append(DebateEvent(EventType.SCORE, "Judge", text(15),
+                                      metadata={"target": speaker, "score": 6}))
+        events.append(DebateEvent(EventType.VERDICT, "Judge", text(200), metadata={
+            "winner": "Alice", "scores": {"Alice": 8, "Bob": 6}, "premise": "A premise",
+            "premise_upheld": True}))
+        return events
+
+    def html_turns(self, turns: int):
+        """HtmlOutput over a transcript of the given length; flags per-event re-rendering cost."""
+        events = self._events(turns)
+        out = HtmlOutput(str(self.tmp / f"html_{turns}.html"))
+        start = time.perf_counter()
+        for event in events:
+            out(event)
+        elapsed = time.perf_counter() - start
+        self.record("html_output", {"turns": turns}, elapsed, len(events), "event")
+
+    def _rows(self, n: int) -> list[dict]:
+        rng = random.Random(n)
+        names = ["Alice", "Bob", "Carol", "Dan", "Erin", "Frank"]
+        models = ["llama3.1:8b", "qwen2.5:14b", "gemma2:9b", "phi4:latest"]
+        rows = []
+        for i in range(n):
+            a, b = rng.sample(names, 2)
+            winner = rng.choice([a, b])
+            rows.append({
+                "run_num": i + 1, "winner": winner, "scores": {a: rng.randint(3, 9), b: rng.randint(3, 9)},
+                "transcript_filename": f"run_{i + 1:03d}.html", "agent_for": a, "agent_against": b,
+                "judge": rng.choice(["Rex", "Sheila"]), "premise": "A premise",
+                "premise_upheld": winner == a, "first_speaker": rng.choice([a, b]),
+                "model_for": rng.choice(models), "model_against": rng.choice(models),
+                "model_judge": rng.choice(models), "judge_json_calls": 9, "judge_json_retries": 0,
+                "timed_out": False,
+                "metrics": [{"model": rng.choice(models), "role": rng.choice(["debater", "judge"]),
+                             "phase": rng.choice(["plan", "think", "turn", "evaluate", "score"]),
+                             "prompt_tokens": rng.randint(500, 4000), "completion_tokens": rng.randint(20, 400),
+                             "ttft": rng.random(), "latency": 1 + rng.random() * 5, "tokens_per_s": 30.0}
+                            for _ in range(40)],
+            })
+        return rows
+
+    def summary_rows(self, n: int):
+        """SummaryHtml and SummaryCsv fed one row at a time, as a batch does.
+
+        SummaryHtml re-renders after every row (refresh=0) rather than every 30s,
+        so a render whose cost grows with the row count still shows up here.
+        """
+        rows = self._rows(n)
+        outputs = [
+            ("summary_html", lambda: SummaryHtml(str(self.tmp / f"summary_html_{n}.html"), refresh=0)),
+            ("summary_csv",  lambda: SummaryCsv(str(self.tmp / f"summary_csv_{n}.csv"))),
+        ]
+        for name, make in outputs:
+            out = make()
+            start = time.perf_counter()
+            for row in rows:
+                out.add_row(row)
+            out.finalize()
+            elapsed = time.perf_counter() - start
+            self.record(name, {"rows": n}, elapsed, n, "row")
+
+    def stats_rows(self, n: int):
+        """compute() over n rows at once, then the same rows added one at a time
+        with the statistics read after each, as the summary outputs do."""
+        rows = self._rows(n)
+        start = time.perf_counter()
+        stats_mod.compute(rows)
+        elapsed = time.perf_counter() - start
+        self.record("stats_compute", {"rows": n}, elapsed, n, "row")
+
+        stats = stats_mod.StatsAccumulator()
+        start = time.perf_counter()
+        for row in rows:
+            stats.add(row)
+            stats.result()
+        elapsed = time.perf_counter() - start
+        self.record("stats_incremental", {"rows": n}, elapsed, n, "row")
+
+    def search_queries(self, n: int):
+        """search_web against the fake provider: n misses, then the same n as cache hits."""
+        queries = [f"query {i} {self.words[i % len(self.words)]}" for i in range(n)]
+        for label in ("miss", "hit"):
+            start = time.perf_counter()
+            for q in queries:
+                search.search_web(q)
+            elapsed = time.perf_counter() - start
+            self.record(f"search_{label}", {"queries": n}, elapsed, n, "query")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: list[dict], baseline_path: str, threshold: float) -> int:
+    baseline = {(r["name"], json.dumps(r["params"], sort_keys=True)): r
+                for r in json.loads(Path(baseline_path).read_text())["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (regression if > {threshold:.2f}x):")
+    for r in results:
+        old = baseline.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if not old or not old["seconds"]:
+            continue
+        ratio = r["seconds"] / old["seconds"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"  {r['name']:<16} {json.dumps(r['params']):<36} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestration and output overhead "
+                                                 "against an in-process fake model and search.")
+    parser.add_argument("--full", action="store_true", help="Run the larger parameter grid")
+    parser.add_argument("--only", nargs="+", choices=list(SCALES), help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Run each case this many times and keep the fastest (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Fake seconds per model call (default: 0, measuring pure overhead)")
+    parser.add_argument("--out", default=None,
+                        help="Results JSON path (default: bench/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", default=None,
+                        help="Compare with an earlier results JSON; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio counted as a regression by --compare (default: 1.25)")
+    args = parser.parse_args()
+
+    configs = load_configs()
+    words = corpus_words(configs)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        search.DDGS = FakeDDGS
+        bench = _Bench(configs, words, args.latency, tmp)
+        print(f"Benchmarks ({'full' if args.full else 'quick'}, latency {args.latency}s/call, "
+              f"best of {args.repeat})")
+        for name, (quick, full) in SCALES.items():
+            if args.only and name not in args.only:
+                continue
+            for params in (full if args.full else quick):
+                fn = getattr(bench, name)
+                for i in range(args.repeat):
+                    search.set_search_cache(search.SearchCache(tmp / f"search_{name}_{i}_{params}.sqlite"))
+                    fn(*params) if isinstance(params, tuple) else fn(params)
+        bench.report()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit":    commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "grid":      "full" if args.full else "quick",
+            "latency":   args.latency,
+            "repeat":    args.repeat,
+        },
+        "results": bench.results,
+    }
+    out = Path(args.out) if args.out else (
+        RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'nogit'}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nResults: {out}")
+
+    if args.compare and _compare(bench.results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
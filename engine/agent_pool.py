@@ -1,6 +1,7 @@
 import random
 
 from .agents import Agent
+from .history import check_history_settings
 from .ollama import list_models
 
 DEFAULT_MODEL = "llama3.1:8b"
@@ -20,19 +21,30 @@ def setup_model_selection(fixed_model: str | None) -> list[str]:
     return available
 
 
-def make_picker(fixed_model: str | None, available_models: list[str], web_research: bool = False):
-    """Return a _pick(cfg_list, side=None) -> Agent closure.
+def make_config_picker(fixed_model: str | None, available_models: list[str],
+                       web_research: bool = False, history: dict | None = None,
+                       judging: str | None = None):
+    """Return a _pick(cfg_list, side=None) -> dict closure.
 
     Each call picks a random persona from cfg_list and assigns a model:
     the fixed model (--model flag), a random choice from available Ollama
-    models, or DEFAULT_MODEL as a last resort.
+    models, or DEFAULT_MODEL as a last resort. history is the config's
+    top-level history: block; a persona's own history: keys override it.
+    judging ("full" or "fast") applies to judges that don't set their own.
+    The result is an Agent config, so a batch can be planned before any
+    Agent is built.
     """
-    def _pick(cfg_list: list[dict], side: str | None = None) -> Agent:
+    def _pick(cfg_list: list[dict], side: str | None = None) -> dict:
         cfg = dict(random.choice(cfg_list))
+        if history or cfg.get("history"):
+            cfg["history"] = {**(history or {}), **cfg.get("history", {})}
+            check_history_settings(cfg["history"])   # when the batch is planned, not per run
         if side is not None:
             cfg["side"] = side
             if web_research:
                 cfg["web_research"] = True
+        elif judging:
+            cfg.setdefault("judging", judging)
         if fixed_model:
             cfg["model"] = fixed_model
         elif cfg.get("model"):
@@ -41,5 +53,15 @@ def make_picker(fixed_model: str | None, available_models: list[str], web_resear
             cfg["model"] = random.choice(available_models)
         else:
             cfg["model"] = DEFAULT_MODEL
-        return Agent(cfg)
+        return cfg
+    return _pick
+
+
+def make_picker(fixed_model: str | None, available_models: list[str], web_research: bool = False,
+                history: dict | None = None, judging: str | None = None):
+    """Return a _pick(cfg_list, side=None) -> Agent closure; see make_config_picker()."""
+    pick_config = make_config_picker(fixed_model, available_models, web_research, history, judging)
+
+    def _pick(cfg_list: list[dict], side: str | None = None) -> Agent:
+        return Agent(pick_config(cfg_list, side))
     return _pick
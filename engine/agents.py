@@ -1,10 +1,20 @@
+import asyncio
+import contextvars
+import functools
 import json
 import re
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+from .backend import get_backend
+from .history import PUBLIC, History
 from .search import search_web
+from .tracing import span
 
-OLLAMA_BASE_URL = "http://localhost:11434/v1"
+# Searches run on their own small pool, shared by every agent in the process, so
+# parallel tool calls and concurrent debates can't flood DuckDuckGo.
+SEARCH_WORKERS = 4
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
 
 _SEARCH_TOOL = {
     "type": "function",
@@ -26,6 +36,9 @@ _SEARCH_TOOL = {
 }
 
 
+JUDGING_MODES = ("full", "fast")
+
+
 def _parse_json(text: str) -> dict:
     """Parse a JSON response, stripping markdown code fences if present."""
     text = re.sub(r"^```(?:json)?\s*\n?", "", text.strip(), flags=re.MULTILINE)
@@ -33,6 +46,75 @@ def _parse_json(text: str) -> dict:
     return json.loads(text.strip())
 
 
+def _schema_format(name: str, schema: dict) -> dict:
+    """response_format asking for output constrained to a JSON schema."""
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema}}
+
+
+def _is_score(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 10
+
+
+_SCORE_SCHEMA = {"type": "integer", "minimum": 0, "maximum": 10}
+
+_ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "evaluation": {"type": "string"},
+        "score":      _SCORE_SCHEMA,
+        "reasoning":  {"type": "string"},
+    },
+    "required": ["evaluation", "score", "reasoning"],
+}
+
+
+def _verdict_schema(names: list[str]) -> dict:
+    # Deliberation comes first so the model reasons before it commits to a winner.
+    return {
+        "type": "object",
+        "properties": {
+            "deliberation": {"type": "string"},
+            "winner":       {"type": "string", "enum": list(names)},
+            "scores":       {
+                "type": "object",
+                "properties": {n: _SCORE_SCHEMA for n in names},
+                "required": list(names),
+            },
+            "announcement": {"type": "string"},
+        },
+        "required": ["deliberation", "winner", "scores", "announcement"],
+    }
+
+
+def _fix_inversion(result: dict, names: list[str]):
+    """Swap the scores if the winner was scored below the loser.
+
+    The winner name is already confirmed; the model sometimes keys the scores backwards.
+    """
+    winner = result.get("winner")
+    if winner and winner in names:
+        loser = next(n for n in names if n != winner)
+        scores = result.get("scores", {})
+        if scores.get(winner, 0) < scores.get(loser, 0):
+            scores[winner], scores[loser] = scores[loser], scores[winner]
+
+
+def _search_query(arguments: str) -> str:
+    try:
+        return json.loads(arguments).get("query", "")
+    except json.JSONDecodeError:
+        # Gemma occasionally produces truncated tool-call JSON; extract with regex
+        m = re.search(r'"query"\s*:\s*"([^"]*)', arguments)
+        return m.group(1).rstrip() if m else ""
+
+
+async def _search(query: str) -> list[dict]:
+    # DDGS is blocking; keep it off the event loop so other debates progress. The
+    # context is carried over (as asyncio.to_thread does) so tracing spans nest.
+    call = functools.partial(contextvars.copy_context().run, search_web, query)
+    return await asyncio.get_running_loop().run_in_executor(_search_pool, call)
+
+
 class Agent:
     def __init__(self, config: dict):
         self.name: str = config["name"]
@@ -50,12 +132,50 @@ class Agent:
         ]))
 
         self.web_research: bool = config.get("web_research", False)
-        self._client = OpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama")
-        self._history: list[dict] = [
-            {"role": "system", "content": system_prompt}
-        ]
+        self.judging: str = config.get("judging", "full")
+        if self.judging not in JUDGING_MODES:
+            raise ValueError(f"judging must be one of {', '.join(JUDGING_MODES)}, got {self.judging!r}")
+        # Structured (JSON) replies requested, and how many had to be asked for again
+        self.json_calls = 0
+        self.json_retries = 0
+        self._backend = get_backend()
+        self._history = History(system_prompt, config.get("history"))
+        # Called with a dict of tokens and timings after every model call (see _call)
+        self.on_metrics = None
+
+    async def _call(self, messages: list[dict], phase: str, tools: list[dict] = None,
+                    response_format: dict = None, on_delta=None):
+        """Make one backend call and report its token counts and timings to on_metrics."""
+        started = time.perf_counter()
+        ttft = None
+
+        def _on_delta(text):
+            nonlocal ttft
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            on_delta(text)
+
+        with span(f"chat {phase}", "model", model=self.model):
+            result = await self._backend.chat(self.model, messages, tools=tools,
+                                              response_format=response_format,
+                                              on_delta=_on_delta if on_delta else None)
+        if self.on_metrics:
+            latency = time.perf_counter() - started
+            generating = latency - (ttft or 0.0)
+            tokens = result.completion_tokens
+            self.on_metrics({
+                "model":             self.model,
+                "phase":             phase,
+                "prompt_tokens":     result.prompt_tokens,
+                "completion_tokens": tokens,
+                "ttft":              round(ttft, 4) if ttft is not None else None,
+                "latency":           round(latency, 4),
+                "tokens_per_s":      round(tokens / generating, 2) if tokens and generating > 0 else None,
+            })
+        return result
 
-    def _tool_chat(self, prompt: str, max_searches: int, on_search=None) -> str:
+    async def _tool_chat(self, prompt: str, max_searches: int, on_search=None,
+                         kind: str = "public", keep: str | None = None) -> str:
         """Run a chat turn with an optional web-search tool loop.
 
         The model may call search_web up to max_searches times before giving its
@@ -63,45 +183,36 @@ class Agent:
         in self._history; intermediate tool-call messages are discarded so history
         stays clean and compact.
         """
-        messages = list(self._history) + [{"role": "user", "content": prompt}]
+        self._history.fit(prompt)
+        messages = self._history.messages + [{"role": "user", "content": prompt}]
+        phase = "turn" if kind == PUBLIC else kind
         last_content = ""
 
         for _ in range(max_searches + 1):
-            response = self._client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=[_SEARCH_TOOL],
-                tool_choice="auto",
-            )
-            msg = response.choices[0].message
+            msg = await self._call(messages, phase, tools=[_SEARCH_TOOL])
 
-            assistant_entry = {"role": "assistant", "content": msg.content or ""}
+            assistant_entry = {"role": "assistant", "content": msg.content}
             if msg.tool_calls:
                 assistant_entry["tool_calls"] = [
                     {
                         "id": tc.id,
                         "type": "function",
-                        "function": {"name": tc.function.name, "arguments": tc.function.arguments},
+                        "function": {"name": tc.name, "arguments": tc.arguments},
                     }
                     for tc in msg.tool_calls
                 ]
             messages.append(assistant_entry)
 
             if not msg.tool_calls:
-                last_content = msg.content or ""
+                last_content = msg.content
                 break
 
-            for tc in msg.tool_calls:
-                try:
-                    args = json.loads(tc.function.arguments)
-                    query = args.get("query", "")
-                except json.JSONDecodeError:
-                    # Gemma occasionally produces truncated tool-call JSON; extract with regex
-                    m = re.search(r'"query"\s*:\s*"([^"]*)', tc.function.arguments)
-                    query = m.group(1).rstrip() if m else ""
-                if not query:
-                    continue
-                results = search_web(query)
+            calls = [(tc, _search_query(tc.arguments)) for tc in msg.tool_calls]
+            calls = [(tc, query) for tc, query in calls if query]
+            # A model often asks for several searches at once; run them together, then
+            # report and append them in the order it asked for them.
+            found = await asyncio.gather(*(_search(query) for _, query in calls))
+            for (tc, query), results in zip(calls, found):
                 if on_search:
                     on_search(query, [{"title": r["title"], "url": r["url"]} for r in results])
                 messages.append({
@@ -112,14 +223,12 @@ class Agent:
         else:
             # Loop exhausted — request a plain-text synthesis
             messages.append({"role": "user", "content": "Summarise your findings."})
-            response = self._client.chat.completions.create(model=self.model, messages=messages)
-            last_content = response.choices[0].message.content or ""
+            last_content = (await self._call(messages, phase)).content
 
-        self._history.append({"role": "user", "content": prompt})
-        self._history.append({"role": "assistant", "content": last_content})
+        self._history.add(prompt, last_content, kind=kind, keep=keep)
         return last_content
 
-    def research(self, topic: str, premise: str = None, on_search=None) -> str:
+    async def research(self, topic: str, premise: str = None, on_search=None) -> str:
         """Search the web for supporting evidence before the debate."""
         side_line = ""
         if premise and self.side:
@@ -135,18 +244,18 @@ class Agent:
             "sources, and established news. After searching, summarise the most useful "
             "findings and note which sources you found."
         )
-        return self._tool_chat(prompt, max_searches=3, on_search=on_search)
+        return await self._tool_chat(prompt, max_searches=3, on_search=on_search, kind="research")
 
-    def plan(self, topic: str) -> str:
+    async def plan(self, topic: str) -> str:
         prompt = (
             f"The debate topic is: {topic}\n\n"
             "Before the debate begins, privately plan your argument. "
             "What are your two or three strongest points? "
             "What counterarguments do you expect, and how will you answer them?"
         )
-        return self.chat(prompt)
+        return await self.chat(prompt, kind="plan")
 
-    def evaluate(self, speaker_name: str, statement: str) -> str:
+    async def evaluate(self, speaker_name: str, statement: str, on_delta=None) -> str:
         prompt = (
             f"{speaker_name} just argued:\n\n\"{statement}\"\n\n"
             "Privately consider this argument. How coherent is the logic? "
@@ -161,9 +270,10 @@ class Agent:
             "How effective is the rhetoric? Note strengths and weaknesses. Do not score yet. "
             "Write in the first person — use 'I', 'my'. Do not refer to yourself by name."
         )
-        return self.chat(prompt)
+        return await self.chat(prompt, on_delta=on_delta, kind="evaluate",
+                               keep=f"{speaker_name} argued:\n\n\"{statement}\"")
 
-    def score(self, speaker_name: str, first: bool = False) -> dict:
+    async def score(self, speaker_name: str, first: bool = False) -> dict:
         """Return {"score": int, "reasoning": str}."""
         if first:
             prompt = (
@@ -182,12 +292,15 @@ class Agent:
                 "The score must be a whole number between 0 and 10 inclusive."
             )
         for attempt in range(3):
+            self.json_calls += 1
             if attempt == 0:
-                raw = self.chat(prompt, json_mode=True)
+                raw = await self.chat(prompt, json_mode=True, kind="score")
             else:
-                raw = self.chat(
+                self.json_retries += 1
+                raw = await self.chat(
                     'That was not valid JSON. Reply with only: {"score": 7, "reasoning": "..."}',
                     json_mode=True,
+                    kind="score",
                 )
             try:
                 return _parse_json(raw)
@@ -195,7 +308,7 @@ class Agent:
                 continue
         return {"score": 5, "reasoning": "Score unavailable."}
 
-    def _extract_verdict_json(self, names: list[str], confirmed_winner: str | None = None) -> dict:
+    async def _extract_verdict_json(self, names: list[str], confirmed_winner: str | None = None) -> dict:
         """Ask the model to emit a structured verdict dict, retrying on bad output.
 
         Up to 3 attempts. Each retry tells the model exactly which field was wrong.
@@ -223,9 +336,11 @@ class Agent:
 
         result: dict = {}
         for attempt in range(3):
+            self.json_calls += 1
             if attempt == 0:
                 prompt = base_prompt
             else:
+                self.json_retries += 1
                 problems = []
                 if result.get("winner") not in names:
                     problems.append(
@@ -240,10 +355,15 @@ class Agent:
                     f"Return ONLY a JSON object in exactly this format:\n{example}"
                 )
 
+            # Backend errors (timeouts, connection failures) propagate; only a
+            # reply that isn't a JSON object of the right shape is retried.
+            raw = await self.chat(prompt, json_mode=True, phase="verdict")
             try:
-                raw = self.chat(prompt, json_mode=True)
                 result = _parse_json(raw)
-            except Exception:
+            except ValueError:
+                result = {}
+                continue
+            if not isinstance(result, dict) or not isinstance(result.get("scores", {}), dict):
                 result = {}
                 continue
 
@@ -262,18 +382,124 @@ class Agent:
             print(f"Warning: judge {self.name!r} produced a malformed verdict after 3 attempts; "
                   f"using fallback (winner={result['winner']!r})")
 
-        # Fix score inversion: if the winner has a lower score than the loser, swap them.
-        # The winner name is already confirmed; the model sometimes keys the scores backwards.
-        winner = result.get("winner")
-        if winner and winner in names:
-            loser = next(n for n in names if n != winner)
-            scores = result.get("scores", {})
-            if scores.get(winner, 0) < scores.get(loser, 0):
-                scores[winner], scores[loser] = scores[loser], scores[winner]
+        _fix_inversion(result, names)
+        return result
 
+    async def _structured(self, prompt: str, name: str, schema: dict, problems_of,
+                          kind: str = "public", keep: str | None = None,
+                          phase: str | None = None) -> dict | None:
+        """Ask for a reply constrained to schema; retry only if it fails validation.
+
+        problems_of(result) lists what is wrong with a parsed reply (empty when
+        valid). Up to 3 attempts; returns None if none of them validate.
+        """
+        response_format = _schema_format(name, schema)
+        for attempt in range(3):
+            self.json_calls += 1
+            if attempt:
+                self.json_retries += 1
+            raw = await self.chat(prompt, response_format=response_format, kind=kind, keep=keep,
+                                  phase=phase)
+            try:
+                result = _parse_json(raw)
+                problems = problems_of(result) if isinstance(result, dict) else ["not a JSON object"]
+            except (json.JSONDecodeError, ValueError):
+                problems = ["the reply was not valid JSON"]
+            if not problems:
+                return result
+            prompt = (f"Your previous response had problems: {'; '.join(problems)}. "
+                      f"Reply again with only the corrected JSON object.")
+            keep = None
+        return None
+
+    async def assess(self, speaker_name: str, statement: str, first: bool = False) -> dict:
+        """Fast judging: evaluate a turn and score the speaker in one structured call.
+
+        Returns {"evaluation": str, "score": int, "reasoning": str}.
+        """
+        score_note = (
+            f"an initial score out of 10 for {speaker_name} based on this first impression"
+            if first else
+            f"your current running score for {speaker_name} out of 10 — cumulative over their "
+            "whole performance so far, revised up if they've strengthened their case or down "
+            "if they've been rebutted"
+        )
+        prompt = (
+            f"{speaker_name} just argued:\n\n\"{statement}\"\n\n"
+            "Privately consider this argument. How coherent is the logic? "
+            "If evidence is used, does it actually warrant the conclusion, or does it merely "
+            "suggest it? If they are challenging their opponent's evidence, is that challenge "
+            "well-reasoned — and if so, credit it as a strong move in its own right. "
+            "Note whether this argument advances their case or merely repeats a point they "
+            "have already made, and whether it is concise. "
+            "Write in the first person — use 'I', 'my'. Do not refer to yourself by name.\n\n"
+            "Respond with a JSON object: \"evaluation\" is your private evaluation, "
+            f"\"score\" is {score_note} (a whole number from 0 to 10), and "
+            "\"reasoning\" is one sentence explaining the score."
+        )
+
+        def _problems(r: dict) -> list[str]:
+            problems = []
+            if not isinstance(r.get("evaluation"), str) or not r["evaluation"].strip():
+                problems.append('"evaluation" must be a non-empty string')
+            if not _is_score(r.get("score")):
+                problems.append(f'"score" must be a whole number from 0 to 10, got {r.get("score")!r}')
+            return problems
+
+        result = await self._structured(prompt, "assessment", _ASSESSMENT_SCHEMA, _problems,
+                                        kind="evaluate",
+                                        keep=f"{speaker_name} argued:\n\n\"{statement}\"")
+        if result is None:
+            return {"evaluation": "", "score": 5, "reasoning": "Score unavailable."}
+        result.setdefault("reasoning", "")
         return result
 
-    def verdict(self, names: list[str], premise: str = None,
+    async def _fast_verdict(self, names: list[str], context: str) -> dict:
+        """Fast judging: deliberation, winner, scores and announcement in one call."""
+        prompt = (
+            f"{context}"
+            f"The debate is over. Respond with a JSON object.\n"
+            f"\"deliberation\": privately weigh up what you just heard. Who made the stronger "
+            f"case and why? Which specific arguments or moments swayed you, and which fell flat? "
+            f"Be specific.\n"
+            f"\"winner\": exactly {names[0]!r} or {names[1]!r}, consistent with your deliberation.\n"
+            f"\"scores\": a whole number from 0 to 10 for each of {names[0]!r} and {names[1]!r}.\n"
+            f"\"announcement\": your verdict delivered to the debaters and audience, briefly — "
+            f"who won, what they did well, and what let the other side down. "
+            f"No more than a short paragraph.\n"
+            f"Write in the first person — use 'I', 'my', 'in my view'. "
+            f"Do not refer to yourself by name or in the third person."
+        )
+
+        def _problems(r: dict) -> list[str]:
+            problems = []
+            if r.get("winner") not in names:
+                problems.append(f'"winner" must be {names[0]!r} or {names[1]!r}, '
+                                f'got {r.get("winner")!r}')
+            scores = r.get("scores")
+            for n in names:
+                if not isinstance(scores, dict) or not _is_score(scores.get(n)):
+                    problems.append(f'"scores" needs a whole number from 0 to 10 for {n!r}')
+            if not isinstance(r.get("announcement"), str) or not r["announcement"].strip():
+                problems.append('"announcement" must be a non-empty string')
+            return problems
+
+        result = await self._structured(prompt, "verdict", _verdict_schema(names), _problems,
+                                        phase="verdict")
+        if result is None:
+            print(f"Warning: judge {self.name!r} produced a malformed verdict after 3 attempts; "
+                  f"using fallback (winner={names[0]!r})")
+            result = {"winner": names[0], "scores": {n: 5 for n in names},
+                      "announcement": "", "deliberation": ""}
+        _fix_inversion(result, names)
+        return {
+            "winner":       result["winner"],
+            "scores":       {n: result["scores"][n] for n in names},
+            "reasoning":    result.get("announcement", ""),
+            "deliberation": result.get("deliberation", ""),
+        }
+
+    async def verdict(self, names: list[str], premise: str = None,
                 sides: dict = None) -> dict:
         """Return {"winner": str, "scores": {name: int, ...}, "reasoning": str}."""
         context = ""
@@ -287,40 +513,46 @@ class Agent:
             if lines:
                 context = "The debate premise was:\n" + "\n".join(lines) + "\n\n"
 
+        if self.judging == "fast":
+            return await self._fast_verdict(names, context)
+
         # Call 1 — private deliberation; persona can come through freely
-        deliberation = self.chat(
+        deliberation = await self.chat(
             f"{context}"
             f"The debate is over. Privately weigh up what you just heard. "
             f"Who made the stronger case and why? Which specific arguments or moments "
             f"swayed you, and which fell flat? Give each debater a score out of 10 "
             f"and decide on a winner. Be specific. Write in the first person — "
-            f"use 'I', 'my', 'in my view'. Do not refer to yourself by name or in the third person."
+            f"use 'I', 'my', 'in my view'. Do not refer to yourself by name or in the third person.",
+            phase="verdict",
         )
 
         # Call 2 — pin the winner before JSON extraction to prevent deliberation/JSON flips
-        name_response = self.chat(
+        name_response = await self.chat(
             f"Based on your deliberation, who won? "
             f"Reply with exactly one of these names and nothing else: "
-            f"{names[0]!r} or {names[1]!r}."
+            f"{names[0]!r} or {names[1]!r}.",
+            phase="verdict",
         )
         confirmed_winner = next((n for n in names if n in name_response), None)
 
         # Call 3 — extract structure from the deliberation with winner locked in
-        result = self._extract_verdict_json(names, confirmed_winner=confirmed_winner)
+        result = await self._extract_verdict_json(names, confirmed_winner=confirmed_winner)
 
         # Call 4 — public announcement in character, shown in the verdict box
-        result["reasoning"] = self.chat(
+        result["reasoning"] = await self.chat(
             f"Now deliver your verdict to the debaters and audience, briefly. "
             f"State who won, what they did well, and what let the other side down. "
             f"Write in the first person — use 'I', 'my', 'in my view'. "
             f"Do not refer to yourself by name or in the third person. "
-            f"No more than a short paragraph."
+            f"No more than a short paragraph.",
+            phase="verdict",
         )
         result["deliberation"] = deliberation   # returned for THINK emission
         return result
 
-    def think_opening(self, topic: str, premise: str = None,
-                      side: str = None, opponent_name: str = "") -> str:
+    async def think_opening(self, topic: str, premise: str = None,
+                      side: str = None, opponent_name: str = "", on_delta=None) -> str:
         side_line = ""
         if side and premise:
             label = "FOR" if side == "for" else "AGAINST"
@@ -334,9 +566,10 @@ class Agent:
             "How will you frame your position from the start? "
             "Do not deliver your opening statement yet."
         )
-        return self.chat(prompt)
+        return await self.chat(prompt, on_delta=on_delta, kind="think")
 
-    def think(self, opponent_message: str, final: bool = False, on_search=None) -> str:
+    async def think(self, opponent_message: str, final: bool = False, on_search=None,
+                    on_delta=None) -> str:
         final_note = (
             " This is your final turn — plan a strong closing argument that "
             "summarises your case and lands a decisive point."
@@ -358,11 +591,13 @@ class Agent:
             f"Plan what you'll say next.{final_note} "
             "Do not give your debate response yet. Write in English only."
         )
+        keep = f"Your opponent said:\n\n\"{opponent_message}\""
         if self.web_research:
-            return self._tool_chat(prompt, max_searches=2, on_search=on_search)
-        return self.chat(prompt)
+            return await self._tool_chat(prompt, max_searches=2, on_search=on_search,
+                                         kind="think", keep=keep)
+        return await self.chat(prompt, on_delta=on_delta, kind="think", keep=keep)
 
-    def respond(self, final: bool = False) -> str:
+    async def respond(self, final: bool = False, on_delta=None) -> str:
         if final:
             instruction = (
                 "This is your final turn. Deliver your closing argument: "
@@ -381,25 +616,37 @@ class Agent:
                 "(for example: 'According to Wikipedia...', 'Ofgem data shows...', "
                 "'The ONS reports...') — the judges reward well-evidenced claims. "
             )
-        return self.chat(
+        return await self.chat(
             instruction +
             "Speak in your own voice only — do not write stage directions, "
             "do not write your opponent's lines, and do not present both sides. "
-            "Respond in English only."
+            "Respond in English only.",
+            on_delta=on_delta,
         )
 
-    def chat(self, message: str, json_mode: bool = False) -> str:
-        self._history.append({"role": "user", "content": message})
+    async def chat(self, message: str, json_mode: bool = False, on_delta=None,
+                   kind: str = "public", keep: str | None = None,
+                   response_format: dict | None = None, phase: str | None = None) -> str:
+        """Send one message and return the reply; on_delta(text) receives it as it streams.
 
-        kwargs = dict(model=self.model, messages=self._history)
-        if json_mode:
-            kwargs["response_format"] = {"type": "json_object"}
-
-        response = self._client.chat.completions.create(**kwargs)
+        kind and keep tag the exchange for history compaction (see History.add).
+        response_format overrides json_mode, e.g. for a schema-constrained reply.
+        phase labels the call's metrics; it defaults to kind, or "turn" for public replies.
+        """
+        self._history.fit(message)
+
+        if response_format is None and json_mode:
+            response_format = {"type": "json_object"}
+        result = await self._call(
+            self._history.messages + [{"role": "user", "content": message}],
+            phase or ("turn" if kind == PUBLIC else kind),
+            response_format=response_format,
+            on_delta=on_delta,
+        )
 
-        reply = response.choices[0].message.content
-        self._history.append({"role": "assistant", "content": reply})
+        reply = result.content
+        self._history.add(message, reply, kind=kind, keep=keep)
         return reply
 
     def reset(self):
-        self._history = [self._history[0]]
+        self._history.reset()
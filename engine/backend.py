@@ -0,0 +1,358 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+OLLAMA_HOST = "http://localhost:11434"
+
+# Local generation on a 14B model can legitimately take minutes; connecting should not.
+DEFAULT_TIMEOUT = httpx.Timeout(connect=10.0, read=600.0, write=30.0, pool=60.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16,
+                              keepalive_expiry=300.0)
+
+DEFAULT_KEEP_ALIVE = "30m"
+
+# Model options Ollama accepts in a request's "options"; it silently ignores anything else
+OLLAMA_OPTIONS = frozenset({
+    "num_ctx", "num_batch", "num_gpu", "main_gpu", "low_vram", "use_mmap", "use_mlock",
+    "num_thread", "numa", "num_keep", "seed", "num_predict", "temperature", "top_k", "top_p",
+    "min_p", "typical_p", "tfs_z", "repeat_last_n", "repeat_penalty", "presence_penalty",
+    "frequency_penalty", "penalize_newline", "mirostat", "mirostat_tau", "mirostat_eta", "stop",
+})
+_OLLAMA_SETTINGS = frozenset({"backend", "hosts", "keep_alive", "models"})
+
+
+def check_ollama_settings(settings: dict) -> None:
+    """Raise ValueError for keys in an `ollama:` block (or a models: entry) that
+    are neither our settings nor Ollama model options, e.g. a misspelt num_ctx."""
+    unknown = set(settings) - _OLLAMA_SETTINGS - OLLAMA_OPTIONS
+    for model, overrides in (settings.get("models") or {}).items():
+        bad = set(overrides) - OLLAMA_OPTIONS - {"keep_alive"}
+        unknown |= {f"models.{model}.{k}" for k in bad}
+    if unknown:
+        raise ValueError(f"Unknown ollama: setting(s): {', '.join(sorted(unknown))}")
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    arguments: str    # raw JSON text, exactly as the model produced it
+
+
+@dataclass
+class ChatResult:
+    content: str = ""
+    tool_calls: list[ToolCall] = field(default_factory=list)
+    # Token counts as reported by the server; None when it didn't say (e.g. a cache hit)
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
+def is_transient_error(e: Exception) -> bool:
+    """True for errors meaning "this host can't serve the request right now", as
+    opposed to a bad request that every host or retry would reject the same way."""
+    if isinstance(e, (httpx.TransportError, openai.APIConnectionError,
+                      openai.InternalServerError, openai.RateLimitError)):
+        return True
+    return isinstance(e, httpx.HTTPStatusError) and (e.response.status_code >= 500
+                                                     or e.response.status_code == 429)
+
+
+async def _close_on_shutdown(client: httpx.AsyncClient):
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+class _PooledBackend:
+    """Shared plumbing: one sync and one async keep-alive pool per host."""
+
+    def __init__(self, host: str = OLLAMA_HOST, timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 limits: httpx.Limits = DEFAULT_LIMITS):
+        self.host = host.rstrip("/")
+        self._timeout = timeout
+        self._limits = limits
+        self._http = httpx.Client(base_url=self.host, timeout=timeout, limits=limits)
+        self._async: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closer = None   # async generator that closes _async with its loop
+
+    def _async_http(self) -> httpx.AsyncClient:
+        # httpx async connections belong to the event loop that opened them, so the
+        # pool is rebuilt if a later asyncio.run() call brings a new loop.
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._loop is not loop:
+            self._async = httpx.AsyncClient(base_url=self.host, timeout=self._timeout,
+                                            limits=self._limits)
+            self._loop = loop
+            # Once a loop has closed its client can no longer be closed, so close it
+            # while the loop shuts down: asyncio.run() finalises every async generator
+            # started on the loop before closing it, aclose() or not.
+            self._closer = _close_on_shutdown(self._async)
+            asyncio.ensure_future(self._closer.__anext__())
+        return self._async
+
+    def list_models(self) -> list[str]:
+        """Return names of models currently installed in Ollama."""
+        resp = self._http.get("/api/tags")
+        resp.raise_for_status()
+        return [m["name"] for m in resp.json().get("models", [])]
+
+    def loaded_models(self) -> list[str]:
+        """Return names of models Ollama currently has loaded in memory."""
+        resp = self._http.get("/api/ps")
+        resp.raise_for_status()
+        return [m["name"] for m in resp.json().get("models", [])]
+
+    async def aclose(self):
+        """Close the async pool; it is reopened on next use."""
+        if self._async is not None:
+            await self._async.aclose()
+            self._async = None
+            self._loop = None
+
+
+class OpenAIBackend(_PooledBackend):
+    """Talks to Ollama's OpenAI-compatible /v1 API over one shared connection pool.
+
+    A single instance is shared by every Agent in the process (see get_backend()),
+    so keep-alive connections are reused across agents and runs instead of each
+    Agent opening its own pool.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client: AsyncOpenAI | None = None
+
+    def _async_client(self) -> AsyncOpenAI:
+        http = self._async_http()
+        if self._client is None or self._client._client is not http:
+            # max_retries=0: retries and failover belong to PolicyBackend and HostPool,
+            # which must see every failure rather than the SDK quietly retrying it
+            self._client = AsyncOpenAI(base_url=f"{self.host}/v1", api_key="ollama",
+                                       http_client=http, max_retries=0)
+        return self._client
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        """Run one completion. With on_delta set (and no tools), the reply is
+        streamed and on_delta(text) is called for each fragment as it arrives."""
+        kwargs = dict(model=model, messages=messages)
+        if tools:
+            kwargs["tools"] = tools
+            kwargs["tool_choice"] = "auto"
+        if response_format:
+            kwargs["response_format"] = response_format
+
+        if on_delta and not tools:
+            return await self._stream(kwargs, on_delta)
+
+        response = await self._async_client().chat.completions.create(**kwargs)
+
+        msg = response.choices[0].message
+        usage = response.usage
+        return ChatResult(
+            content=msg.content or "",
+            tool_calls=[
+                ToolCall(id=tc.id, name=tc.function.name, arguments=tc.function.arguments)
+                for tc in msg.tool_calls or []
+            ],
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+        )
+
+    async def _stream(self, kwargs: dict, on_delta) -> ChatResult:
+        parts = []
+        usage = None
+        stream = await self._async_client().chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True})
+        async for chunk in stream:
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                parts.append(piece)
+                on_delta(piece)
+            if chunk.usage:
+                usage = chunk.usage
+        return ChatResult(content="".join(parts),
+                          prompt_tokens=usage.prompt_tokens if usage else None,
+                          completion_tokens=usage.completion_tokens if usage else None)
+
+    async def aclose(self):
+        self._client = None
+        await super().aclose()
+
+
+def _native_message(msg: dict) -> dict:
+    """Convert an OpenAI-style message to /api/chat form.
+
+    Only role, content and tool_calls are sent, always built in the same key
+    order, so an agent's unchanged history serialises to identical bytes on
+    every call and Ollama can reuse its cached prefix.
+    """
+    out = {"role": msg["role"], "content": msg.get("content") or ""}
+    if msg.get("tool_calls"):
+        calls = []
+        for tc in msg["tool_calls"]:
+            try:
+                arguments = json.loads(tc["function"]["arguments"])
+            except json.JSONDecodeError:
+                arguments = {}
+            calls.append({"function": {"name": tc["function"]["name"], "arguments": arguments}})
+        out["tool_calls"] = calls
+    return out
+
+
+def _native_format(response_format: dict | None):
+    if not response_format:
+        return None
+    if response_format.get("type") == "json_schema":
+        return response_format["json_schema"]["schema"]
+    return "json"
+
+
+class OllamaBackend(_PooledBackend):
+    """Talks to Ollama's native /api/chat endpoint.
+
+    Unlike the /v1 shim, this sets keep_alive and options such as num_ctx on
+    every request. Each model gets the same settings every time: a num_ctx that
+    changes between calls makes Ollama reload the model, and a short keep_alive
+    lets it be evicted between turns.
+
+    settings is the `ollama:` block of a debate YAML, e.g.
+
+        ollama:
+          backend: native
+          hosts: [gpu1:11434, gpu2:11434]   # optional; see hosts.HostPool
+          keep_alive: 30m
+          num_ctx: 8192
+          models:
+            qwen2.5:14b: {num_ctx: 16384}
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, settings: dict = None, **kwargs):
+        super().__init__(host, **kwargs)
+        settings = settings or {}
+        check_ollama_settings(settings)
+        self._keep_alive = settings.get("keep_alive", DEFAULT_KEEP_ALIVE)
+        self._options = {k: v for k, v in settings.items() if k not in _OLLAMA_SETTINGS}
+        self._per_model: dict = settings.get("models", {})
+
+    def _request(self, model: str, messages: list[dict], tools, response_format,
+                 stream: bool) -> dict:
+        per_model = self._per_model.get(model, {})
+        options = {**self._options,
+                   **{k: v for k, v in per_model.items() if k != "keep_alive"}}
+        body = {
+            "model": model,
+            "messages": [_native_message(m) for m in messages],
+            "stream": stream,
+            "keep_alive": per_model.get("keep_alive", self._keep_alive),
+        }
+        if options:
+            body["options"] = options
+        if tools:
+            body["tools"] = tools
+        fmt = _native_format(response_format)
+        if fmt:
+            body["format"] = fmt
+        return body
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        """Run one completion. With on_delta set (and no tools), the reply is
+        streamed and on_delta(text) is called for each fragment as it arrives."""
+        stream = bool(on_delta) and not tools
+        body = self._request(model, messages, tools, response_format, stream)
+        http = self._async_http()
+
+        if not stream:
+            resp = await http.post("/api/chat", json=body)
+            resp.raise_for_status()
+            data = resp.json()
+            msg = data["message"]
+            return ChatResult(
+                content=msg.get("content") or "",
+                tool_calls=[
+                    ToolCall(id=tc.get("id") or f"call_{i}",
+                             name=tc["function"]["name"],
+                             arguments=json.dumps(tc["function"]["arguments"]))
+                    for i, tc in enumerate(msg.get("tool_calls") or [])
+                ],
+                prompt_tokens=data.get("prompt_eval_count"),
+                completion_tokens=data.get("eval_count"),
+            )
+
+        parts = []
+        final: dict = {}
+        async with http.stream("POST", "/api/chat", json=body) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                piece = chunk.get("message", {}).get("content")
+                if piece:
+                    parts.append(piece)
+                    on_delta(piece)
+                if chunk.get("done"):
+                    final = chunk
+        return ChatResult(content="".join(parts),
+                          prompt_tokens=final.get("prompt_eval_count"),
+                          completion_tokens=final.get("eval_count"))
+
+
+BACKENDS = {"openai": OpenAIBackend, "native": OllamaBackend}
+
+_backend = None
+
+
+def get_backend():
+    """Return the process-wide backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        _backend = OpenAIBackend()
+    return _backend
+
+
+def set_backend(backend) -> None:
+    """Replace the process-wide backend (e.g. a different host or a test double)."""
+    global _backend
+    _backend = backend
+
+
+def build_backend(kind: str | None = None, settings: dict | None = None,
+                  hosts: list[str] | None = None):
+    """Create a backend from a CLI choice and a YAML `ollama:` block.
+
+    kind overrides settings["backend"]; both default to the OpenAI-compatible shim.
+    hosts overrides settings["hosts"]; with more than one host, calls are spread
+    over them by a HostPool.
+    """
+    from .hosts import HostPool, parse_hosts
+
+    settings = settings or {}
+    check_ollama_settings(settings)
+    kind = kind or settings.get("backend", "openai")
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown backend {kind!r}; expected one of {', '.join(BACKENDS)}")
+    hosts = hosts or parse_hosts(settings.get("hosts")) or [OLLAMA_HOST]
+
+    def _one(host: str):
+        return OllamaBackend(host, settings=settings) if kind == "native" else OpenAIBackend(host)
+
+    return _one(hosts[0]) if len(hosts) == 1 else HostPool([_one(h) for h in hosts])
+
+
+def configure_backend(kind: str | None = None, settings: dict | None = None,
+                      hosts: list[str] | None = None):
+    """Install the process-wide backend; see build_backend()."""
+    backend = build_backend(kind, settings, hosts)
+    set_backend(backend)
+    return backend
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from .backend import ChatResult, ToolCall, get_backend, set_backend
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+TOUCH_BATCH = 64    # hits whose access times are written to the file in one go
+
+
+def request_key(model: str, messages: list[dict], tools: list[dict] | None,
+                response_format: dict | None) -> str:
+    """Content address of a chat request: SHA-256 over its canonical JSON."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "tools": tools or None,
+         "response_format": response_format or None},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Single-file SQLite store of chat completions with size-based LRU eviction.
+
+    Entries are keyed by request_key(); each hit refreshes the entry's access
+    time, and once the stored replies exceed max_bytes the least recently used
+    are evicted. Access times are kept in memory and written with the next
+    put(), flush() or close(), so a hit is a single read.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._touched: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> ChatResult | None:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            self.hits += 1
+        data = json.loads(row[0])
+        return ChatResult(content=data["content"],
+                          tool_calls=[ToolCall(**tc) for tc in data["tool_calls"]])
+
+    def put(self, key: str, result: ChatResult):
+        value = json.dumps(asdict(result), ensure_ascii=False)
+        with self._lock:
+            self._write_touched()
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._bytes += len(value) - (old[0] if old else 0)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    @property
+    def pending(self) -> int:
+        """Hits whose access time hasn't been written yet."""
+        return len(self._touched)
+
+    def flush(self):
+        """Write the access times of hits since the last write."""
+        with self._lock:
+            if self._touched:
+                self._write_touched()
+                self._db.commit()
+
+    def _write_touched(self):
+        self._db.executemany("UPDATE responses SET accessed = ? WHERE key = ?",
+                             [(t, k) for k, t in self._touched.items()])
+        self._touched.clear()
+
+    def _evict(self):
+        if self._bytes <= self._max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if self._bytes <= self._max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "entries":   entries,
+            "bytes":     self._bytes,
+        }
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+
+class CachingBackend:
+    """Wraps another backend and answers repeated requests from a ResponseCache.
+
+    A hit replays the stored reply, through on_delta as one fragment when the
+    caller is streaming, so outputs behave the same either way. Writes to the
+    cache file run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, inner, cache: ResponseCache):
+        self._inner = inner
+        self.cache = cache
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        key = request_key(model, messages, tools, response_format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if self.cache.pending >= TOUCH_BATCH:
+                await asyncio.to_thread(self.cache.flush)
+            if on_delta and cached.content:
+                on_delta(cached.content)
+            return cached
+        result = await self._inner.chat(model, messages, tools=tools,
+                                        response_format=response_format, on_delta=on_delta)
+        await asyncio.to_thread(self.cache.put, key, result)
+        return result
+
+    def list_models(self) -> list[str]:
+        return self._inner.list_models()
+
+    async def aclose(self):
+        await asyncio.to_thread(self.cache.flush)
+        await self._inner.aclose()
+
+
+def enable_response_cache(path: str, max_mb: float | None = None) -> ResponseCache:
+    """Wrap the process-wide backend in a CachingBackend stored at path."""
+    max_bytes = int(max_mb * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+    cache = ResponseCache(path, max_bytes=max_bytes)
+    set_backend(CachingBackend(get_backend(), cache))
+    return cache
@@ -0,0 +1,117 @@
+import random
+from dataclasses import dataclass
+
+from .backend import build_backend, configure_backend
+from .cache import ResponseCache, enable_response_cache
+from .hosts import HOSTS_ENV, HostPool, hosts_from_env, parse_hosts
+from .policy import PolicyBackend, enable_request_policy
+from .replay import ReplayBackend, enable_recording, enable_replay
+from .search import SearchCache, configure_search_cache
+
+
+@dataclass
+class BackendSetup:
+    seed: int | None = None
+    response_cache: ResponseCache | None = None
+    replay: ReplayBackend | None = None
+    hosts: HostPool | None = None
+    policy: PolicyBackend | None = None
+    search: SearchCache | None = None
+
+
+def add_backend_args(parser):
+    """Add the model-backend options shared by single_debate.py and multi_debate.py."""
+    parser.add_argument("--backend", choices=["openai", "native"], default=None,
+                        help="Ollama API: the OpenAI-compatible /v1 shim, or native /api/chat with "
+                             "keep_alive/num_ctx from the config's ollama: block "
+                             "(default: the config's ollama.backend, else openai)")
+    parser.add_argument("--hosts", default=None,
+                        help="Comma-separated Ollama hosts to spread calls over, e.g. "
+                             f"gpu1:11434,gpu2:11434 (default: ${HOSTS_ENV}, the config's "
+                             "ollama.hosts, else localhost:11434)")
+    parser.add_argument("--call-timeout", type=float, default=None, metavar="SECONDS",
+                        help="Give up on a model call after this long and retry it "
+                             "(default: the config's requests.timeout, else no limit)")
+    parser.add_argument("--retries", type=int, default=None,
+                        help="Retries for a call that timed out or hit a connection/server error, "
+                             "with exponential backoff (default: requests.retries, else 2)")
+    parser.add_argument("--hedge-after", type=float, default=None, metavar="SECONDS",
+                        help="Send a second copy of a call still unanswered after this long and "
+                             "keep whichever answers first (default: requests.hedge_after, else off)")
+    parser.add_argument("--hedge-host", default=None,
+                        help="Send hedged copies to this Ollama host instead of the main backend")
+    parser.add_argument("--response-cache", metavar="PATH", default=None,
+                        help="Reuse model replies for identical requests from this SQLite file. Reruns "
+                             "become nearly free, but identical prompts always get the same reply")
+    parser.add_argument("--response-cache-mb", type=float, default=None,
+                        help="Size cap for --response-cache before least recently used replies "
+                             "are evicted (default: 256)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed persona/model/speaking-order picks (default: random; "
+                             "--replay uses the recorded seed)")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="Record every model call (request, reply, timings) to this JSONL file, "
+                             "including calls answered from --response-cache")
+    parser.add_argument("--replay", metavar="PATH", default=None,
+                        help="Serve model calls from a --record file instead of Ollama. "
+                             "Web searches still go through the search cache")
+    parser.add_argument("--replay-realtime", action="store_true",
+                        help="With --replay, reproduce the recorded latency of each call")
+
+
+def setup_backend(args, config: dict) -> BackendSetup:
+    """Install the process-wide backend described by the parsed args and seed random."""
+    setup = BackendSetup(seed=args.seed)
+    if args.replay:
+        setup.replay = enable_replay(args.replay, realtime=args.replay_realtime)
+        if setup.seed is None:
+            setup.seed = setup.replay.meta.get("seed")
+    else:
+        backend = configure_backend(args.backend, config.get("ollama"),
+                                    hosts=parse_hosts(args.hosts) or hosts_from_env())
+        if isinstance(backend, HostPool):
+            setup.hosts = backend
+            print(f"Ollama hosts: {', '.join(backend.hosts)}")
+        overrides = {"timeout": args.call_timeout, "retries": args.retries,
+                     "hedge_after": args.hedge_after}
+        if config.get("requests") or args.hedge_host or any(v is not None for v in overrides.values()):
+            hedge = (build_backend(args.backend, config.get("ollama"), hosts=parse_hosts(args.hedge_host))
+                     if args.hedge_host else None)
+            setup.policy = enable_request_policy(config.get("requests"), hedge=hedge, **overrides)
+
+    if args.record and setup.seed is None:
+        setup.seed = random.randrange(2 ** 32)   # a replay needs the same picks
+    if setup.seed is not None:
+        random.seed(setup.seed)
+    if args.response_cache:
+        setup.response_cache = enable_response_cache(args.response_cache, args.response_cache_mb)
+    if args.record:
+        # Outermost, so replies served from the response cache are recorded too
+        enable_recording(args.record, meta={"config": args.config, "seed": setup.seed})
+    if config.get("web_research") or config.get("search"):
+        setup.search = configure_search_cache(config.get("search"))
+    return setup
+
+
+def report_backend(setup: BackendSetup):
+    if setup.response_cache:
+        c = setup.response_cache.stats()
+        print(f"Response cache: {c['hits']} hits / {c['misses']} misses, "
+              f"{c['evictions']} evicted, {c['entries']} stored")
+    if setup.replay:
+        print(f"Replay: {setup.replay.served} calls served, "
+              f"{setup.replay.mismatches} not matched exactly")
+    if setup.search:
+        setup.search.flush()   # last chance to write batched access times
+        c = setup.search.stats()
+        print(f"Search cache: {c['hits']} hits, {c['coalesced']} coalesced, "
+              f"{c['misses']} misses ({c['expired']} expired), "
+              f"{c['evictions']} evicted, {c['entries']} stored")
+    if setup.policy:
+        p = setup.policy.stats()
+        print(f"Requests: {p['calls']} calls, {p['retried']} retried, {p['timeouts']} timed out, "
+              f"{p['hedged']} hedged ({p['hedge_wins']} won by the hedge)")
+    if setup.hosts:
+        for host, info in setup.hosts.placement().items():
+            state = "" if info["up"] else "  [down]"
+            print(f"  {host}: {info['served']} calls, loaded: {', '.join(info['loaded']) or '-'}{state}")
@@ -1,9 +1,59 @@
+import asyncio
+
 from .agents import Agent
-from .events import DebateEvent, EventType
+from .backend import get_backend
+from .dispatch import OutputDispatcher
+from .events import DELTA_TYPES, STREAM_OF, DebateEvent, EventType
+from .tracing import span, track
+
+
+class _EventGate:
+    """Emit function that holds events until open(), then dispatches them live.
+
+    Work that overlaps another agent's emits through a gate, so the transcript
+    keeps the order of a sequential run. Deltas are dropped while closed, and a
+    stream already under way when the gate opens stays suppressed until its
+    complete THINK/TURN event, so outputs never see a stream with its start cut off.
+    """
+
+    def __init__(self, debate: "Debate"):
+        self._debate = debate
+        self._held: list[DebateEvent] = []
+        self._open = False
+        self._cut: set = set()   # delta types whose stream started while closed
+
+    def __call__(self, event_type, speaker="", content="", **meta):
+        if event_type in DELTA_TYPES:
+            if not self._open or event_type in self._cut:
+                self._cut.add(event_type)
+                return
+        elif event_type in STREAM_OF:
+            self._cut.discard(STREAM_OF[event_type])
+        if not self._debate._wants(event_type):
+            return
+        event = self._debate._event(event_type, speaker, content, **meta)
+        if self._open:
+            self._debate._dispatch(event)
+        else:
+            self._held.append(event)
+
+    def open(self):
+        if self._open:
+            return
+        self._open = True
+        for event in self._held:
+            self._debate._dispatch(event)
+        self._held.clear()
 
 
 class Debate:
-    """Orchestrates a single debate between two agents with an optional judge."""
+    """Orchestrates a single debate between two agents with an optional judge.
+
+    Events reach the outputs through an OutputDispatcher, off the event loop;
+    overflow is its policy for an output that falls behind ("block" or
+    "drop-deltas"). Emitting never blocks; under "block", each step (a turn,
+    a judgement) waits at its end for lagging outputs to catch up.
+    """
 
     def __init__(
         self,
@@ -14,6 +64,7 @@ class Debate:
         turns: int = 6,
         judge: Agent = None,
         outputs: list = None,
+        overflow: str = "block",
     ):
         self._agent_a = agent_a
         self._agent_b = agent_b
@@ -22,6 +73,8 @@ class Debate:
         self._turns = turns
         self._judge = judge
         self._outputs = outputs or []
+        self._overflow = overflow
+        self._dispatcher: OutputDispatcher | None = None   # started by run()
 
         self._color_map = {a.name: a.color for a in [agent_a, agent_b]}
         if judge:
@@ -29,19 +82,49 @@ class Debate:
 
         self._sides = {a.name: a.side for a in [agent_a, agent_b] if a.side}
         self._scored: set = set()
+        self._judging: asyncio.Task | None = None   # judge's in-flight evaluate/score
+
+        for agent, role in [(agent_a, "debater"), (agent_b, "debater"), (judge, "judge")]:
+            if agent:
+                agent.on_metrics = self._metrics_reporter(agent, role)
 
     # ── Event dispatch ──────────────────────────────────────────────────────
 
-    def _emit(self, event_type, speaker="", content="", **meta):
-        event = DebateEvent(
+    def _event(self, event_type, speaker="", content="", **meta) -> DebateEvent:
+        return DebateEvent(
             type=event_type,
             speaker=speaker,
             content=content,
             color=self._color_map.get(speaker, "white"),
             metadata=meta,
         )
-        for out in self._outputs:
-            out(event)
+
+    def _wants(self, event_type) -> bool:
+        return self._dispatcher.wants(event_type)
+
+    def _dispatch(self, event: DebateEvent):
+        self._dispatcher(event)
+
+    def _emit(self, event_type, speaker="", content="", **meta):
+        if self._wants(event_type):
+            self._dispatch(self._event(event_type, speaker, content, **meta))
+
+    def _metrics_reporter(self, agent: Agent, role: str):
+        """Return an Agent.on_metrics callback that emits each call's METRICS event.
+
+        Metrics are not part of the transcript, so they go out live even while
+        the agent's other events are held by a gate.
+        """
+        def _on_metrics(metrics: dict):
+            self._emit(EventType.METRICS, agent.name, role=role, **metrics)
+        return _on_metrics
+
+    @staticmethod
+    def _streamer(emit, event_type, speaker: str):
+        """Return an on_delta callback that emits each streamed fragment."""
+        def _on_delta(text):
+            emit(event_type, speaker, text)
+        return _on_delta
 
     # ── Debate phases ────────────────────────────────────────────────────────
 
@@ -64,70 +147,148 @@ class Debate:
             } if self._judge else None,
         )
 
-    def _planning_phase(self):
-        for agent in (self._agent_a, self._agent_b):
+    async def _prepare(self, agent: Agent, emit):
+        """Research (if enabled) and plan for one debater, reporting through emit."""
+        with track(agent.name), span("_prepare", agent=agent.name):
             if agent.web_research:
-                def _on_search(query, results, _name=agent.name):
-                    self._emit(EventType.SEARCH, _name, query, results=results)
-                summary = agent.research(self._topic, self._premise, on_search=_on_search)
-                self._emit(EventType.THINK, agent.name, summary)
-            self._emit(EventType.PLAN, agent.name, agent.plan(self._topic))
-
-    def _opening_statement(self) -> str:
-        self._emit(EventType.THINK, self._agent_a.name,
-                   self._agent_a.think_opening(
-                       self._topic,
-                       premise=self._premise,
-                       side=self._agent_a.side,
-                       opponent_name=self._agent_b.name,
-                   ))
-        side_line = ""
-        if self._agent_a.side and self._premise:
-            label = "FOR" if self._agent_a.side == "for" else "AGAINST"
-            side_line = f"You are arguing {label} the premise: \"{self._premise}\"\n\n"
-        opening = (
-            f"The debate topic is: {self._topic}\n\n"
-            f"{side_line}"
-            f"Your opponent is {self._agent_b.name}. "
-            f"Deliver your opening argument now, in your own voice. "
-            f"Speak directly and make your case. "
-            f"Do not write stage directions, do not write your opponent's lines, "
-            f"and do not present both sides — give only your own argument."
-        )
-        message = self._agent_a.chat(opening)
-        self._emit(EventType.TURN, self._agent_a.name, message)
-        return message
-
-    def _judge_turn(self, speaker_name: str, statement: str):
-        self._emit(EventType.THINK, self._judge.name,
-                   self._judge.evaluate(speaker_name, statement))
-        result = self._judge.score(speaker_name, first=speaker_name not in self._scored)
-        self._scored.add(speaker_name)
-        self._emit(EventType.SCORE, self._judge.name, result.get("reasoning", ""),
-                   target=speaker_name, score=result.get("score"))
-
-    def _turn_loop(self, opening_message: str):
+                def _on_search(query, results):
+                    emit(EventType.SEARCH, agent.name, query, results=results)
+                summary = await agent.research(self._topic, self._premise, on_search=_on_search)
+                emit(EventType.THINK, agent.name, summary)
+            emit(EventType.PLAN, agent.name, await agent.plan(self._topic))
+            await self._dispatcher.drain()
+
+    async def _planning_phase(self):
+        # The debaters' histories are independent, so both prepare at once. A's
+        # events go out live; B's are held until A is done, giving the same
+        # transcript order as running the two one after the other.
+        with span("_planning_phase"):
+            gate_b = _EventGate(self)
+            task_b = asyncio.create_task(self._prepare(self._agent_b, gate_b))
+            try:
+                await self._prepare(self._agent_a, self._emit)
+                gate_b.open()
+                await task_b
+            finally:
+                task_b.cancel()   # no-op once finished; stops B if A failed
+
+    async def _opening_statement(self) -> str:
+        with span("_opening_statement", speaker=self._agent_a.name):
+            self._emit(EventType.THINK, self._agent_a.name,
+                       await self._agent_a.think_opening(
+                           self._topic,
+                           premise=self._premise,
+                           side=self._agent_a.side,
+                           opponent_name=self._agent_b.name,
+                           on_delta=self._streamer(self._emit, EventType.THINK_DELTA, self._agent_a.name),
+                       ))
+            side_line = ""
+            if self._agent_a.side and self._premise:
+                label = "FOR" if self._agent_a.side == "for" else "AGAINST"
+                side_line = f"You are arguing {label} the premise: \"{self._premise}\"\n\n"
+            opening = (
+                f"The debate topic is: {self._topic}\n\n"
+                f"{side_line}"
+                f"Your opponent is {self._agent_b.name}. "
+                f"Deliver your opening argument now, in your own voice. "
+                f"Speak directly and make your case. "
+                f"Do not write stage directions, do not write your opponent's lines, "
+                f"and do not present both sides — give only your own argument."
+            )
+            message = await self._agent_a.chat(
+                opening,
+                on_delta=self._streamer(self._emit, EventType.TURN_DELTA, self._agent_a.name),
+            )
+            self._emit(EventType.TURN, self._agent_a.name, message)
+            await self._dispatcher.drain()
+            return message
+
+    async def _judge_turn(self, speaker_name: str, statement: str):
+        with track(self._judge.name), span("_judge_turn", target=speaker_name):
+            first = speaker_name not in self._scored
+            if self._judge.judging == "fast":
+                result = await self._judge.assess(speaker_name, statement, first=first)
+                self._scored.add(speaker_name)
+                if result.get("evaluation"):
+                    self._emit(EventType.THINK, self._judge.name, result["evaluation"])
+                self._emit(EventType.SCORE, self._judge.name, result.get("reasoning", ""),
+                           target=speaker_name, score=result.get("score"))
+                await self._dispatcher.drain()
+                return
+            self._emit(EventType.THINK, self._judge.name,
+                       await self._judge.evaluate(
+                           speaker_name, statement,
+                           on_delta=self._streamer(self._emit, EventType.THINK_DELTA, self._judge.name),
+                       ))
+            result = await self._judge.score(speaker_name, first=first)
+            self._scored.add(speaker_name)
+            self._emit(EventType.SCORE, self._judge.name, result.get("reasoning", ""),
+                       target=speaker_name, score=result.get("score"))
+            await self._dispatcher.drain()
+
+    def _start_judging(self, speaker_name: str, statement: str):
+        """Start the judge's evaluate/score of a turn as a background task.
+
+        The judge's history is separate from the debaters', so the next speaker
+        can think and respond while the judge works on the previous turn.
+        """
+        self._judging = asyncio.create_task(self._judge_turn(speaker_name, statement))
+
+    def _gate_on_judging(self) -> _EventGate:
+        """Return a gate that opens as soon as the in-flight judge task succeeds."""
+        gate = _EventGate(self)
+
+        def _on_done(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is None:
+                gate.open()
+        self._judging.add_done_callback(_on_done)
+        return gate
+
+    async def _finish_judging(self):
+        """Wait for the in-flight judge task, if any, re-raising its failure."""
+        judging, self._judging = self._judging, None
+        if judging:
+            await judging
+
+    async def _speaker_turn(self, speaker: Agent, message: str, final: bool, emit) -> str:
+        def _on_search(query, results):
+            emit(EventType.SEARCH, speaker.name, query, results=results)
+        emit(EventType.THINK, speaker.name,
+             await speaker.think(message, final=final, on_search=_on_search,
+                                 on_delta=self._streamer(emit, EventType.THINK_DELTA, speaker.name)))
+        reply = await speaker.respond(
+            final=final, on_delta=self._streamer(emit, EventType.TURN_DELTA, speaker.name))
+        emit(EventType.TURN, speaker.name, reply)
+        await self._dispatcher.drain()
+        return reply
+
+    async def _turn_loop(self, opening_message: str):
         message = opening_message
         speaker, listener = self._agent_b, self._agent_a
         remaining = self._turns - 1
         for i in range(remaining):
             final = (i >= remaining - 2)  # last two turns: each debater's final go
-            name = speaker.name
-            def _on_search(query, results, _name=name):
-                self._emit(EventType.SEARCH, _name, query, results=results)
-            self._emit(EventType.THINK, name, speaker.think(message, final=final, on_search=_on_search))
-            message = speaker.respond(final=final)
-            self._emit(EventType.TURN, speaker.name, message)
-            if self._judge:
-                self._judge_turn(speaker.name, message)
+            with span("turn", turn=i + 2, speaker=speaker.name):
+                # While the judge is still on the previous turn, hold this speaker's
+                # events so the judge's THINK/SCORE land next to the turn they assess;
+                # the gate opens as soon as the judge is done.
+                emit = self._gate_on_judging() if self._judging else self._emit
+                message = await self._speaker_turn(speaker, message, final, emit)
+                with span("wait_for_judge"):
+                    await self._finish_judging()
+                if isinstance(emit, _EventGate):
+                    emit.open()
+                if self._judge:
+                    self._start_judging(speaker.name, message)
             speaker, listener = listener, speaker
 
-    def _verdict_phase(self):
-        result = self._judge.verdict(
-            [self._agent_a.name, self._agent_b.name],
-            premise=self._premise,
-            sides=self._sides,
-        )
+    async def _verdict_phase(self):
+        with track(self._judge.name), span("_verdict_phase"):
+            result = await self._judge.verdict(
+                [self._agent_a.name, self._agent_b.name],
+                premise=self._premise,
+                sides=self._sides,
+            )
         winner = result.get("winner")
         premise_upheld = None
         if self._premise and winner and self._sides:
@@ -146,19 +307,63 @@ class Debate:
             scores=result.get("scores", {}),
             premise=self._premise,
             premise_upheld=premise_upheld,
+            json_calls=self._judge.json_calls,
+            json_retries=self._judge.json_retries,
         )
 
     # ── Entry point ──────────────────────────────────────────────────────────
 
-    def run(self):
-        self._emit_header()
-        self._planning_phase()
-        opening_message = self._opening_statement()
-        if self._judge:
-            self._judge_turn(self._agent_a.name, opening_message)
-        self._turn_loop(opening_message)
-        if self._judge:
-            self._verdict_phase()
+    async def run(self):
+        self._dispatcher = OutputDispatcher(self._outputs, self._overflow)
+        try:
+            with span("Debate.run", topic=self._topic):
+                self._emit_header()
+                await self._planning_phase()
+                opening_message = await self._opening_statement()
+                try:
+                    if self._judge:
+                        self._start_judging(self._agent_a.name, opening_message)
+                    await self._turn_loop(opening_message)
+                    await self._finish_judging()   # every score is in before the verdict
+                finally:
+                    if self._judging:
+                        self._judging.cancel()
+                if self._judge:
+                    await self._verdict_phase()
+        finally:
+            await self._dispatcher.aclose()   # every event reaches every output, even on failure
+        self._dispatcher.raise_errors()
+
+
+class DebateTimeout(TimeoutError):
+    """A debate ran past its deadline and was cancelled."""
+
+
+async def run_debate_async(
+    agent_a: Agent,
+    agent_b: Agent,
+    topic: str,
+    premise: str = None,
+    turns: int = 6,
+    judge: Agent = None,
+    outputs: list = None,
+    deadline: float = None,
+    overflow: str = "block",
+):
+    """Run one debate; with deadline (seconds) set, cancel it and raise DebateTimeout
+    if it has not finished in time. Outputs keep whatever was emitted before then."""
+    debate = Debate(agent_a, agent_b, topic, premise, turns, judge, outputs, overflow)
+    if deadline is None:
+        await debate.run()
+        return
+    timeout = asyncio.timeout(deadline)
+    try:
+        async with timeout:
+            await debate.run()
+    except TimeoutError:
+        if not timeout.expired():
+            raise   # a single call timing out, not the deadline
+        raise DebateTimeout(f"Debate did not finish within {deadline:g}s") from None
 
 
 def run_debate(
@@ -169,5 +374,13 @@ def run_debate(
     turns: int = 6,
     judge: Agent = None,
     outputs: list = None,
+    overflow: str = "block",
 ):
-    Debate(agent_a, agent_b, topic, premise, turns, judge, outputs).run()
+    """Blocking wrapper around run_debate_async() for single-debate scripts."""
+    async def _run():
+        try:
+            await run_debate_async(agent_a, agent_b, topic, premise, turns, judge, outputs,
+                                   overflow=overflow)
+        finally:
+            await get_backend().aclose()
+    asyncio.run(_run())
@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import queue
+import threading
+from collections import deque
+from dataclasses import replace
+
+from .events import DELTA_TYPES, STREAM_OF, DebateEvent, EventType, subscriptions
+from .tracing import span, track
+
+OVERFLOW_POLICIES = ("block", "drop-deltas")
+DEFAULT_QUEUE_SIZE = 1024
+
+_STOP = object()
+_PUT_WAIT = 0.25   # seconds a feeder waits on a full queue before trying again
+
+
+class _Worker:
+    """One output, fed from its own bounded queue by its own thread."""
+
+    def __init__(self, output, queue_size: int):
+        self.output = output
+        self.name = type(output).__name__
+        self.queue: queue.Queue = queue.Queue(queue_size)
+        self.dropped = 0
+        self.error: Exception | None = None
+        self.cut: set = set()   # (delta type, speaker) streams dropped for this output
+        self.pending: deque = deque()   # waiting for room in the queue, in emit order
+        self.feeder: asyncio.Task | None = None
+        # Each thread needs its own copy of the context; spans land on the debate's track
+        context = contextvars.copy_context()
+        self.thread = threading.Thread(target=context.run, args=(self._run,),
+                                       name=f"output-{self.name}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        with track(self.name):
+            while True:
+                event = self.queue.get()
+                if event is _STOP:
+                    return
+                if self.error is None:
+                    try:
+                        if event.type in DELTA_TYPES:
+                            self.output(event)
+                        else:
+                            with span(self.name, "output", event=event.type.name):
+                                self.output(event)
+                    except Exception as e:
+                        self.error = e   # stop feeding this output; raised after the debate
+
+    def full(self) -> bool:
+        return bool(self.pending) or self.queue.full()
+
+    def send(self, event):
+        """Queue event without blocking the event loop; if there's no room, the feeder waits for it."""
+        if not self.pending:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                pass
+        self.pending.append(event)
+        if self.feeder is None:
+            self.feeder = asyncio.ensure_future(self._feed())
+
+    async def _feed(self):
+        try:
+            while self.pending:
+                if await asyncio.to_thread(self._put, self.pending[0]):
+                    self.pending.popleft()
+        finally:
+            self.feeder = None
+
+    def _put(self, event) -> bool:
+        # Timed, so a wedged output never holds an executor thread for long
+        try:
+            self.queue.put(event, timeout=_PUT_WAIT)
+            return True
+        except queue.Full:
+            return False
+
+
+class OutputDispatcher:
+    """Delivers debate events to outputs on background threads.
+
+    Each output has its own queue and thread, so it sees events in emit order
+    while slow writes (or a slow terminal) don't hold up the debate. When an
+    output's queue is full, the overflow policy decides what happens:
+
+        block        events wait, in order, for room in the queue; the debate
+                     step that emitted them waits in drain() for the output
+                     to catch up, while the event loop carries on
+        drop-deltas  streamed fragments are dropped instead; once a fragment of
+                     a stream is dropped the rest of that stream is too, so a
+                     live view stops early rather than skipping words. Complete
+                     events are never dropped; the one that closes a cut stream
+                     arrives with metadata["truncated"] set, so the output can
+                     show the text it missed.
+
+    Each event goes only to the outputs whose `subscribes` set includes its
+    type (see events.subscriptions), looked up in a table built up front.
+
+    Emitting never blocks. aclose() delivers everything still queued and
+    stops the threads. An exception raised by an output stops delivery to it;
+    raise_errors() re-raises the first one.
+    """
+
+    def __init__(self, outputs: list, overflow: str = "block",
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}, "
+                             f"not {overflow!r}")
+        self._overflow = overflow
+        self._workers = [_Worker(out, queue_size) for out in outputs if subscriptions(out)]
+        self._routes: dict[EventType, list[_Worker]] = {
+            t: [w for w in self._workers if t in subscriptions(w.output)] for t in EventType
+        }
+        self._closed = False
+
+    def wants(self, event_type: EventType) -> bool:
+        """Whether any output subscribes to event_type; if not, don't bother making the event."""
+        return bool(self._routes[event_type])
+
+    def __call__(self, event: DebateEvent):
+        if self._closed:
+            return   # e.g. a cancelled task's last gasp after the debate ended
+        for worker in self._routes[event.type]:
+            if self._overflow == "drop-deltas" and event.type in DELTA_TYPES:
+                key = (event.type, event.speaker)
+                if key in worker.cut:
+                    worker.dropped += 1
+                    continue
+                if worker.full():
+                    worker.cut.add(key)
+                    worker.dropped += 1
+                else:
+                    worker.queue.put_nowait(event)   # room: nothing pending, so no feeder is putting
+                continue
+            if worker.cut and (STREAM_OF.get(event.type), event.speaker) in worker.cut:
+                worker.cut.discard((STREAM_OF[event.type], event.speaker))
+                # This output saw only the start of the stream; tell it so it shows the rest
+                worker.send(replace(event, metadata={**event.metadata, "truncated": True}))
+                continue
+            worker.send(event)
+
+    @property
+    def dropped(self) -> int:
+        return sum(w.dropped for w in self._workers)
+
+    async def drain(self):
+        """Wait until every event emitted so far has a place in its output's queue."""
+        for feeder in [w.feeder for w in self._workers if w.feeder]:
+            await asyncio.shield(feeder)   # a cancelled waiter mustn't lose queued events
+
+    async def aclose(self):
+        """Wait for every queued event to be delivered, then stop the threads."""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.send(_STOP)
+        await self.drain()
+        for worker in self._workers:
+            await asyncio.to_thread(worker.thread.join)
+
+    def raise_errors(self):
+        for worker in self._workers:
+            if worker.error is not None:
+                raise worker.error
@@ -10,9 +10,26 @@ class EventType(Enum):
     TURN = auto()     # agent's public statement
     SCORE = auto()    # judge scores a speaker
     VERDICT = auto()  # judge's final verdict
+    THINK_DELTA = auto()  # streamed fragment of a THINK still being generated
+    TURN_DELTA = auto()   # streamed fragment of a TURN still being generated
+    METRICS = auto()      # one model call's tokens and timings; metadata only, not transcript
 
 
-@dataclass
+# Incremental events; each stream is always followed by its complete THINK/TURN event
+DELTA_TYPES = frozenset({EventType.THINK_DELTA, EventType.TURN_DELTA})
+
+# Complete event that closes each kind of delta stream
+STREAM_OF = {EventType.THINK: EventType.THINK_DELTA, EventType.TURN: EventType.TURN_DELTA}
+
+ALL_EVENTS = frozenset(EventType)
+
+
+def subscriptions(output) -> frozenset:
+    """The event types an output wants: its `subscribes` attribute, else all of them."""
+    return getattr(output, "subscribes", ALL_EVENTS)
+
+
+@dataclass(slots=True)
 class DebateEvent:
     type: EventType
     speaker: str = ""
@@ -0,0 +1,137 @@
+# Rough characters-per-token for English prose; close enough for budgeting
+# without pulling in a tokenizer per model.
+CHARS_PER_TOKEN = 4
+
+DEFAULT_KEEP_RECENT = 6       # exchanges always kept verbatim
+DEFAULT_SUMMARY_CHARS = 300
+COMPACT_TARGET = 0.75         # compact down to this fraction of the budget
+
+PUBLIC = "public"
+_LABELS = {
+    "research": "My earlier research notes",
+    "plan":     "My pre-debate plan",
+    "think":    "My private reflection",
+    "evaluate": "My private evaluation",
+    "score":    "My running score",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def condense(text: str, max_chars: int) -> str:
+    """Keep the leading sentences of text, up to max_chars."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if end > max_chars // 3:
+        return cut[:end + 1] + " …"
+    return cut.rsplit(" ", 1)[0] + " …"
+
+
+def check_history_settings(settings: dict) -> None:
+    """Raise ValueError for keys in a `history:` block that History doesn't know."""
+    unknown = set(settings) - {"max_tokens", "keep_recent", "private", "summary_chars"}
+    if unknown:
+        raise ValueError(f"Unknown history: setting(s): {', '.join(sorted(unknown))}")
+
+
+class History:
+    """An agent's message history, bounded by an optional token budget.
+
+    Each prompt/reply pair is stored as an exchange tagged with a kind. Public
+    exchanges (turns, verdicts) are always kept verbatim. Private ones (research,
+    plan, think, evaluate, score) are condensed or dropped once they fall outside
+    the most recent keep_recent exchanges and the history is over budget.
+
+    Compaction runs in one batch down to COMPACT_TARGET of the budget rather than
+    trimming a little before every call, so the message prefix stays byte-stable
+    for many calls in a row and the server's prefix cache keeps being reused.
+
+    settings is the `history:` block of a debate YAML (or a persona override):
+
+        history:
+          max_tokens: 6000     # budget; omit for unbounded history
+          keep_recent: 6       # exchanges always kept verbatim
+          private: summarise   # or "drop"
+          summary_chars: 300   # length of each condensed private reply
+    """
+
+    def __init__(self, system_prompt: str, settings: dict = None):
+        settings = settings or {}
+        check_history_settings(settings)
+        self.max_tokens: int | None = settings.get("max_tokens")
+        self.keep_recent: int = settings.get("keep_recent", DEFAULT_KEEP_RECENT)
+        self.private: str = settings.get("private", "summarise")
+        self.summary_chars: int = settings.get("summary_chars", DEFAULT_SUMMARY_CHARS)
+        if self.private not in ("summarise", "drop"):
+            raise ValueError(f"history.private must be 'summarise' or 'drop', got {self.private!r}")
+
+        self._system = {"role": "system", "content": system_prompt}
+        self._exchanges: list[dict] = []   # {kind, keep, messages, compacted}
+        self._tokens = estimate_tokens(system_prompt)
+
+    @property
+    def messages(self) -> list[dict]:
+        out = [self._system]
+        for ex in self._exchanges:
+            out.extend(ex["messages"])
+        return out
+
+    @property
+    def system_prompt(self) -> str:
+        return self._system["content"]
+
+    def add(self, prompt: str, reply: str, kind: str = PUBLIC, keep: str | None = None):
+        """Record one exchange.
+
+        keep is the part of a private prompt that must survive compaction, e.g.
+        the opponent's statement quoted in a think prompt.
+        """
+        messages = [{"role": "user", "content": prompt},
+                    {"role": "assistant", "content": reply}]
+        self._exchanges.append({"kind": kind, "keep": keep, "messages": messages,
+                                "compacted": False})
+        self._tokens += self._size(messages)
+
+    def fit(self, incoming: str = ""):
+        """Compact older private exchanges if the next call would exceed the budget."""
+        if self.max_tokens is None:
+            return
+        if self._tokens + estimate_tokens(incoming) <= self.max_tokens:
+            return
+        target = int(self.max_tokens * COMPACT_TARGET) - estimate_tokens(incoming)
+        candidates = self._exchanges[:max(len(self._exchanges) - self.keep_recent, 0)]
+        for ex in candidates:
+            if self._tokens <= target:
+                break
+            if ex["kind"] == PUBLIC or ex["compacted"]:
+                continue
+            self._tokens -= self._size(ex["messages"])
+            ex["messages"] = self._compacted(ex)
+            ex["compacted"] = True
+            self._tokens += self._size(ex["messages"])
+        self._exchanges = [ex for ex in self._exchanges if ex["messages"]]
+
+    def reset(self):
+        self._exchanges = []
+        self._tokens = estimate_tokens(self.system_prompt)
+
+    def _compacted(self, ex: dict) -> list[dict]:
+        label = _LABELS.get(ex["kind"], "An earlier private exchange")
+        if self.private == "drop":
+            if not ex["keep"]:
+                return []
+            reply = f"[{label}, omitted]"
+        else:
+            reply = condense(ex["messages"][1]["content"], self.summary_chars)
+        prompt = ex["keep"] or f"[{label}, condensed]"
+        return [{"role": "user", "content": prompt},
+                {"role": "assistant", "content": reply}]
+
+    @staticmethod
+    def _size(messages: list[dict]) -> int:
+        return sum(estimate_tokens(m["content"]) for m in messages)
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from .backend import ChatResult, is_transient_error
+
+HOSTS_ENV = "OLLAMA_HOSTS"
+
+RETRY_DOWN_AFTER = 30.0    # seconds before a host that dropped is tried again
+REFRESH_LOADED = 15.0      # seconds between /api/ps polls of each host
+
+
+def parse_hosts(value: str | list[str] | None) -> list[str]:
+    """Split a comma-separated host list (or pass a YAML list through), adding http://."""
+    if not value:
+        return []
+    items = value.split(",") if isinstance(value, str) else value
+    hosts = []
+    for item in items:
+        item = item.strip().rstrip("/")
+        if item:
+            hosts.append(item if "://" in item else f"http://{item}")
+    return hosts
+
+
+def hosts_from_env() -> list[str]:
+    return parse_hosts(os.environ.get(HOSTS_ENV))
+
+
+@dataclass
+class _Host:
+    backend: object
+    installed: set = field(default_factory=set)
+    loaded: set = field(default_factory=set)
+    in_flight: int = 0
+    served: int = 0
+    down_until: float = 0.0
+    refreshed: float = 0.0
+
+    @property
+    def up(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class HostPool:
+    """Spreads chat calls for the whole process over several Ollama hosts.
+
+    Each host has its own backend (and so its own connection pool). A call goes
+    to a host that has the model installed, preferring one that already has it
+    loaded, then the one with the fewest calls in flight. A host that refuses
+    connections or errors is skipped for RETRY_DOWN_AFTER seconds and the call
+    moves on to the next candidate at that first error; the host backends don't
+    retry on their own. A streamed reply that breaks after text has
+    been shown is not retried, since the fragments can't be taken back.
+
+    Which models are loaded where comes from each host's /api/ps, re-read every
+    REFRESH_LOADED seconds, plus the pool's own record of where it sent calls.
+    """
+
+    def __init__(self, backends: list):
+        if not backends:
+            raise ValueError("HostPool needs at least one host")
+        self._hosts = [_Host(backend) for backend in backends]
+
+    @property
+    def hosts(self) -> list[str]:
+        return [h.backend.host for h in self._hosts]
+
+    def list_models(self) -> list[str]:
+        """Return every model installed on any reachable host, in first-seen order."""
+        merged: dict[str, None] = {}
+        for host in self._hosts:
+            try:
+                installed = host.backend.list_models()
+                host.loaded = set(host.backend.loaded_models())
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"[Ollama host {host.backend.host} unavailable: {e}]")
+                host.down_until = time.monotonic() + RETRY_DOWN_AFTER
+                continue
+            host.installed = set(installed)
+            host.refreshed = time.monotonic()
+            merged.update(dict.fromkeys(installed))
+        return list(merged)
+
+    def placement(self) -> dict[str, dict]:
+        """Per host: installed and loaded models, calls served and in flight, and whether it is up."""
+        return {
+            h.backend.host: {"installed": sorted(h.installed), "loaded": sorted(h.loaded),
+                             "served": h.served, "in_flight": h.in_flight, "up": h.up}
+            for h in self._hosts
+        }
+
+    async def _refresh(self, host: _Host):
+        if time.monotonic() - host.refreshed < REFRESH_LOADED:
+            return
+        host.refreshed = time.monotonic()
+        try:
+            host.loaded = set(await asyncio.to_thread(host.backend.loaded_models))
+        except (httpx.HTTPError, ValueError):
+            pass   # routing falls back to in-flight counts; chat() finds out if it's really down
+
+    def _candidates(self, model: str) -> list[_Host]:
+        up = [h for h in self._hosts if h.up]
+        having = [h for h in up if model in h.installed] or up
+        # If every host is marked down, try them all rather than failing outright.
+        having = having or list(self._hosts)
+        return sorted(having, key=lambda h: (model not in h.loaded, h.in_flight))
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        await asyncio.gather(*(self._refresh(h) for h in self._hosts if h.up))
+        streamed = False
+
+        def _on_delta(text):
+            nonlocal streamed
+            streamed = True
+            on_delta(text)
+
+        last_error = None
+        for host in self._candidates(model):
+            host.in_flight += 1
+            try:
+                result = await host.backend.chat(model, messages, tools=tools,
+                                                 response_format=response_format,
+                                                 on_delta=_on_delta if on_delta else None)
+            except Exception as e:
+                if not is_transient_error(e):
+                    raise
+                last_error = e
+                host.down_until = time.monotonic() + RETRY_DOWN_AFTER
+                host.loaded.discard(model)
+                print(f"[Ollama host {host.backend.host} failed ({type(e).__name__}); "
+                      f"marking it down for {RETRY_DOWN_AFTER:.0f}s]")
+                if streamed:
+                    raise
+                continue
+            finally:
+                host.in_flight -= 1
+            host.loaded.add(model)
+            host.down_until = 0.0
+            host.served += 1
+            return result
+        raise last_error
+
+    def loaded_models(self) -> list[str]:
+        return sorted(set().union(*(h.loaded for h in self._hosts)))
+
+    async def aclose(self):
+        for host in self._hosts:
+            await host.backend.aclose()
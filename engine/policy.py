@@ -0,0 +1,162 @@
+import asyncio
+import random
+
+from .backend import ChatResult, get_backend, is_transient_error, set_backend
+
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 2.0      # seconds before the first retry; doubles each time
+MAX_BACKOFF = 60.0
+
+_jitter = random.Random()   # separate from the seeded module RNG used for picks
+
+
+class CallTimeout(TimeoutError):
+    """A single model call took longer than the policy's timeout."""
+
+
+class PolicyBackend:
+    """Wraps another backend with per-call timeouts, retries and hedged requests.
+
+    timeout bounds each attempt. Attempts that time out or fail with a
+    transient error (connection refused, 5xx, 429) are retried up to retries
+    times with jittered exponential backoff. With hedge_after set, an attempt
+    still unanswered after that many seconds is raced against a second request
+    to hedge (default: the same backend, which a HostPool will route to its
+    least busy host); the first reply wins and the other is cancelled.
+
+    A streamed reply that has already shown text is never retried or hedged,
+    since the fragments can't be taken back; a hedge only races while neither
+    request has started streaming, and whichever streams first owns the reply.
+
+    settings is the `requests:` block of a debate YAML:
+
+        requests:
+          timeout: 300        # seconds per attempt; omit for none
+          retries: 2
+          backoff: 2          # seconds before the first retry
+          hedge_after: 90     # seconds; omit to disable hedging
+    """
+
+    def __init__(self, inner, timeout: float | None = None, retries: int = DEFAULT_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, hedge_after: float | None = None,
+                 hedge=None):
+        self._inner = inner
+        self._hedge = hedge or inner
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+        self.calls = 0
+        self.retried = 0
+        self.timeouts = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def _attempt(self, backend, model, messages, tools, response_format, on_delta):
+        call = backend.chat(model, messages, tools=tools, response_format=response_format,
+                            on_delta=on_delta)
+        if self.timeout is None:
+            return await call
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise CallTimeout(f"{model} did not answer within {self.timeout:g}s") from None
+
+    async def _hedged(self, model, messages, tools, response_format, on_delta) -> ChatResult:
+        owner = None   # the attempt allowed to stream; the first to produce a fragment
+
+        def _delta_for(tag):
+            def _on_delta(text):
+                nonlocal owner
+                if owner is None:
+                    owner = tag
+                if owner == tag:
+                    on_delta(text)
+            return _on_delta if on_delta else None
+
+        primary = asyncio.create_task(self._attempt(
+            self._inner, model, messages, tools, response_format, _delta_for("primary")))
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done or owner is not None:
+            return await primary
+
+        self.hedged += 1
+        backup = asyncio.create_task(self._attempt(
+            self._hedge, model, messages, tools, response_format, _delta_for("hedge")))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins += 1
+                        return task.result()
+                if owner is not None and pending:
+                    # The streaming request failed; its partial text can't be replaced.
+                    break
+            raise next(iter(done)).exception()
+        finally:
+            for task in (primary, backup):
+                task.cancel()
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        self.calls += 1
+        streamed = False
+
+        def _on_delta(text):
+            nonlocal streamed
+            streamed = True
+            on_delta(text)
+
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                if self.hedge_after is not None:
+                    return await self._hedged(model, messages, tools, response_format,
+                                              _on_delta if on_delta else None)
+                return await self._attempt(self._inner, model, messages, tools, response_format,
+                                           _on_delta if on_delta else None)
+            except Exception as e:
+                retryable = isinstance(e, CallTimeout) or is_transient_error(e)
+                if not retryable or streamed or attempt == self.retries:
+                    raise
+                self.retried += 1
+                print(f"[{model} call failed ({type(e).__name__}); "
+                      f"retrying in {delay:.0f}s, attempt {attempt + 2} of {self.retries + 1}]")
+                await asyncio.sleep(delay * _jitter.uniform(0.8, 1.2))
+                delay = min(delay * 2, MAX_BACKOFF)
+
+    def stats(self) -> dict:
+        return {
+            "calls":      self.calls,
+            "retried":    self.retried,
+            "timeouts":   self.timeouts,
+            "hedged":     self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def list_models(self) -> list[str]:
+        return self._inner.list_models()
+
+    async def aclose(self):
+        await self._inner.aclose()
+        if self._hedge is not self._inner:
+            await self._hedge.aclose()
+
+
+def enable_request_policy(settings: dict | None = None, hedge=None, **overrides) -> PolicyBackend:
+    """Wrap the process-wide backend in a PolicyBackend.
+
+    settings is the YAML `requests:` block; keyword overrides (e.g. from the
+    command line) take precedence where they are not None.
+    """
+    options = {**(settings or {}), **{k: v for k, v in overrides.items() if v is not None}}
+    unknown = set(options) - {"timeout", "retries", "backoff", "hedge_after"}
+    if unknown:
+        raise ValueError(f"Unknown requests: setting(s): {', '.join(sorted(unknown))}")
+    backend = PolicyBackend(get_backend(), hedge=hedge, **options)
+    set_backend(backend)
+    return backend
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import re
+from collections import Counter
+from pathlib import Path
+
+from .search import STOPWORDS, canonical_query, search_web
+from .tracing import span
+
+SEARCHES_FILE = "searches.jsonl"
+DEFAULT_CONCURRENCY = 2     # DuckDuckGo rate-limits bursts quickly
+MAX_PAST_QUERIES = 40
+MAX_SEED_WORDS = 12
+
+_LEAD_IN = re.compile(r"^(?:(?:but|and|so|yet)\s+)?you\s+"
+                      r"(?:(?:argue|contend)\s+that|(?:believe|maintain)(?:\s+that)?)\s+", re.I)
+_SECOND_PERSON = re.compile(r"\byou(?:rs?|rself)?\b", re.I)
+_BEFORE_CLAUSE = re.compile(r"(.*)(?:[,;:]|\s[-–]\s)", re.S)   # text up to the last clause break
+_RUN_DIR = r"{stem}_\d{{8}}_\d{{6}}"   # multi_debate.py's <config>_YYYYMMDD_HHMMSS
+
+
+def record_searches(run_dir: str, run_num: int, queries: list[str]):
+    """Append one run's search queries to the run directory's searches.jsonl."""
+    if not queries:
+        return
+    path = Path(run_dir) / SEARCHES_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"run_num": run_num, "queries": queries}, ensure_ascii=False) + "\n")
+
+
+def _position_query(position: str) -> str:
+    # The first sentence that states a claim ("You argue that X" gives X; "You
+    # argue from experience." is skipped), cut down to its keywords. Clauses from
+    # the first one still addressed to the debater ("... - you think") are
+    # dropped, as is a sentence that has nothing before one.
+    for sentence in re.split(r"(?<=[.!?])\s+", position.strip()):
+        claim = _LEAD_IN.sub("", sentence).rstrip(".!?")
+        addressed = _SECOND_PERSON.search(claim)
+        if addressed:
+            before = _BEFORE_CLAUSE.match(claim[:addressed.start()])
+            claim = before.group(1) if before else ""
+        words = [w.strip(",;:") for w in claim.split()
+                 if w.lower() not in STOPWORDS and w not in ("-", "–")]
+        if words:
+            return " ".join(words[:MAX_SEED_WORDS])
+    return ""
+
+
+def seed_queries(config: dict) -> list[str]:
+    """Queries derived from the config: the topic, the premise and each debater's position."""
+    queries = [config.get("topic", ""), config.get("premise", "")]
+    for side in ("for", "against"):
+        for persona in config.get(side, []):
+            if persona.get("position"):
+                queries.append(_position_query(persona["position"]))
+    return [q for q in queries if q]
+
+
+def past_queries(results_dir: str, config_stem: str, limit: int = MAX_PAST_QUERIES) -> list[str]:
+    """The queries earlier batches of this config searched for most often.
+
+    Reads results/<config>_<timestamp>/searches.jsonl, so configs whose names
+    merely start with config_stem are left out; variants of one query (by
+    canonical form) are counted together.
+    """
+    counts: Counter[str] = Counter()
+    spelling: dict[str, str] = {}
+    run_dir = re.compile(_RUN_DIR.format(stem=re.escape(config_stem)))
+    for path in sorted(Path(results_dir).glob(f"{config_stem}_*/{SEARCHES_FILE}")):
+        if not run_dir.fullmatch(path.parent.name):
+            continue
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                queries = json.loads(line).get("queries", [])
+            except ValueError:
+                continue
+            for query in queries:
+                key = canonical_query(query)
+                counts[key] += 1
+                spelling.setdefault(key, query)
+    return [spelling[key] for key, _ in counts.most_common(limit)]
+
+
+async def prewarm(queries: list[str], concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+    """Run the given searches into the search cache, at most concurrency at a time.
+
+    Queries with the same canonical form are searched once. A failed search
+    (e.g. a rate limit) is counted and skipped; the debate will try again.
+    """
+    unique: dict[str, str] = {}
+    for query in queries:
+        unique.setdefault(canonical_query(query), query)
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def _one(query: str):
+        nonlocal failed
+        async with semaphore:
+            try:
+                await asyncio.to_thread(search_web, query)
+            except Exception as e:
+                failed += 1
+                print(f"[Pre-warm search failed for {query!r}: {e}]")
+
+    with span("prewarm", "search", queries=len(unique)):
+        await asyncio.gather(*(_one(q) for q in unique.values()))
+    return {"queries": len(unique), "failed": failed}
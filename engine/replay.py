@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict
+from pathlib import Path
+
+from .backend import ChatResult, ToolCall, get_backend, set_backend
+from .cache import request_key
+
+
+class RecordingBackend:
+    """Wraps another backend and appends every completion to a JSONL file.
+
+    Each line holds the request, the reply and its timings (seconds from the
+    start of the recording, time to first streamed fragment, total latency), so
+    ReplayBackend can feed a later run without a live Ollama.
+    """
+
+    def __init__(self, inner, path: str, meta: dict = None):
+        self._inner = inner
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._path.open("w", encoding="utf-8")
+        self._start = time.perf_counter()
+        self._write({"type": "meta", **(meta or {})})
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        started = time.perf_counter()
+        first_token = None
+
+        def _on_delta(text):
+            nonlocal first_token
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            on_delta(text)
+
+        result = await self._inner.chat(model, messages, tools=tools,
+                                        response_format=response_format,
+                                        on_delta=_on_delta if on_delta else None)
+        self._write({
+            "type":            "chat",
+            "key":             request_key(model, messages, tools, response_format),
+            "model":           model,
+            "request":         {"messages": messages, "tools": tools,
+                                "response_format": response_format},
+            "response":        asdict(result),
+            "started":         round(started - self._start, 4),
+            "first_token":     round(first_token, 4) if first_token is not None else None,
+            "latency":         round(time.perf_counter() - started, 4),
+        })
+        return result
+
+    def list_models(self) -> list[str]:
+        models = self._inner.list_models()
+        self._write({"type": "models", "models": models})
+        return models
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+class ReplayBackend:
+    """Serves completions from a RecordingBackend file instead of a live server.
+
+    Requests are matched on their content key, so concurrent runs replay
+    correctly whatever order their calls arrive in. A request that was never
+    recorded (e.g. a different random seed) gets the next unused reply for the
+    same model and is counted in `mismatches`. With realtime set, each reply is
+    delayed by its recorded latency, and streamed fragments are spread over it.
+    """
+
+    def __init__(self, path: str, realtime: bool = False):
+        self.realtime = realtime
+        self.meta: dict = {}
+        self.models: list[str] = []
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        self._by_model: dict[str, deque] = defaultdict(deque)
+        self._used: set = set()
+        self.served = 0
+        self.mismatches = 0
+
+        with open(path, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                entry = json.loads(line)
+                if entry["type"] == "meta":
+                    self.meta = entry
+                elif entry["type"] == "models":
+                    self.models = entry["models"]
+                elif entry["type"] == "chat":
+                    entry["index"] = i
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_model[entry["model"]].append(entry)
+
+    def _take(self, model: str, key: str) -> dict:
+        queue = self._by_key.get(key)
+        while queue:
+            entry = queue.popleft()
+            if entry["index"] not in self._used:
+                self._used.add(entry["index"])
+                return entry
+        self.mismatches += 1
+        queue = self._by_model.get(model)
+        while queue:
+            entry = queue.popleft()
+            if entry["index"] not in self._used:
+                self._used.add(entry["index"])
+                return entry
+        raise LookupError(f"Recording has no unused completions left for model {model!r}")
+
+    async def chat(self, model: str, messages: list[dict], tools: list[dict] = None,
+                   response_format: dict = None, on_delta=None) -> ChatResult:
+        entry = self._take(model, request_key(model, messages, tools, response_format))
+        self.served += 1
+        response = entry["response"]
+        result = ChatResult(content=response["content"],
+                            tool_calls=[ToolCall(**tc) for tc in response["tool_calls"]],
+                            prompt_tokens=response.get("prompt_tokens"),
+                            completion_tokens=response.get("completion_tokens"))
+        latency = entry["latency"] if self.realtime else 0.0
+
+        if on_delta and not tools and result.content:
+            first = (entry.get("first_token") or 0.0) if self.realtime else 0.0
+            words = result.content.split(" ")
+            step = (latency - first) / len(words) if words else 0.0
+            await asyncio.sleep(first)
+            for i, word in enumerate(words):
+                on_delta(word if i == len(words) - 1 else word + " ")
+                await asyncio.sleep(step)
+        else:
+            await asyncio.sleep(latency)
+        return result
+
+    def list_models(self) -> list[str]:
+        return list(self.models) or sorted(self._by_model)
+
+    async def aclose(self):
+        pass
+
+
+def enable_recording(path: str, meta: dict = None) -> RecordingBackend:
+    """Wrap the process-wide backend so every completion is recorded to path."""
+    backend = RecordingBackend(get_backend(), path, meta)
+    set_backend(backend)
+    return backend
+
+
+def enable_replay(path: str, realtime: bool = False) -> ReplayBackend:
+    """Replace the process-wide backend with a replay of the recording at path."""
+    backend = ReplayBackend(path, realtime=realtime)
+    set_backend(backend)
+    return backend
@@ -0,0 +1,96 @@
+import random
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass
+class RunPlan:
+    """Everything random about one run of a batch, decided before it starts."""
+    run_num: int
+    cfg_for: dict
+    cfg_against: dict
+    cfg_judge: dict | None
+    for_first: bool
+
+    def call_models(self, turns: int) -> list[str]:
+        """Approximate order in which the run's calls hit each model."""
+        first, second = ((self.cfg_for, self.cfg_against) if self.for_first
+                         else (self.cfg_against, self.cfg_for))
+        a, b = first["model"], second["model"]
+        judge = self.cfg_judge["model"] if self.cfg_judge else None
+        calls = [a, b, a]                       # planning, opening
+        speakers = [b, a]
+        for i in range(turns):                  # opening's judging, then each later turn
+            if judge:
+                calls.append(judge)
+            if i < turns - 1:
+                calls.append(speakers[i % 2])
+        if judge:
+            calls.append(judge)                 # verdict
+        return calls
+
+
+def sample_runs(config: dict, count: int, pick_config) -> list[RunPlan]:
+    """Draw every run's personas, models and speaking order up front.
+
+    The draws are made in the same order, one run after another, as when each
+    run picked for itself, so the batch keeps the same distribution.
+    """
+    plans = []
+    for run_num in range(1, count + 1):
+        cfg_for     = pick_config(config["for"],      side="for")
+        cfg_against = pick_config(config["against"],  side="against")
+        cfg_judge   = pick_config(config["audience"]) if "audience" in config else None
+        order = ["for", "against"]
+        random.shuffle(order)
+        plans.append(RunPlan(run_num, cfg_for, cfg_against, cfg_judge, order[0] == "for"))
+    return plans
+
+
+def _touch(resident: OrderedDict, model: str, slots: int) -> int:
+    """Mark model as used in an LRU of resident models; return 1 if it had to load."""
+    if model in resident:
+        resident.move_to_end(model)
+        return 0
+    resident[model] = True
+    if len(resident) > slots:
+        resident.popitem(last=False)
+    return 1
+
+
+def count_loads(plans: list[RunPlan], turns: int, slots: int = 1) -> int:
+    """Estimate model loads for running plans in order with `slots` models resident."""
+    resident: OrderedDict = OrderedDict()
+    return sum(_touch(resident, model, slots)
+               for plan in plans for model in plan.call_models(turns))
+
+
+def schedule(plans: list[RunPlan], turns: int, slots: int = 1) -> list[RunPlan]:
+    """Order plans so consecutive runs reuse models that are already resident.
+
+    Runs with the same model call pattern are grouped and run back to back.
+    Groups are chained greedily: next comes the group whose first run would
+    load the fewest models given what is resident now, with bigger groups
+    first on ties. Only execution order changes; run numbers and draws do not.
+    If the greedy order would not load fewer models, the sampled order is kept.
+    """
+    groups: dict[tuple, list[RunPlan]] = {}
+    for plan in plans:
+        groups.setdefault(tuple(plan.call_models(turns)), []).append(plan)
+
+    resident: OrderedDict = OrderedDict()
+    remaining = list(groups)
+    ordered: list[RunPlan] = []
+    while remaining:
+        def _cost(calls):
+            trial = OrderedDict(resident)
+            return sum(_touch(trial, model, slots) for model in calls), -len(groups[calls])
+        best = min(remaining, key=_cost)
+        remaining.remove(best)
+        for plan in groups[best]:
+            for model in best:
+                _touch(resident, model, slots)
+            ordered.append(plan)
+    if count_loads(ordered, turns, slots) >= count_loads(plans, turns, slots):
+        return list(plans)
+    return ordered
@@ -1,22 +1,359 @@
 import hashlib
 import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from pathlib import Path
 
 from ddgs import DDGS
 
+from .tracing import span
+
 _CACHE_DIR = Path(__file__).parent.parent / "cache"
+_DB_NAME = "search.sqlite"
+
+DEFAULT_TTL = 30 * 24 * 3600          # results go stale; news especially
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MEMORY_ENTRIES = 512
+TOUCH_BATCH = 64    # reads whose access times are written to the file in one go
+
+
+# Dropped when keying a query; they rarely change what a search engine returns
+STOPWORDS = frozenset(
+    "a an the of in on at to for from by with about into and or is are was were be "
+    "been do does did its it this that these those".split()
+)
+_JOINED = re.compile(r"(?<=[^\W\d])['’.]+(?=[^\W\d])")    # U.K. -> uk, farmer's -> farmers
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def canonical_query(query: str) -> str:
+    """Normalise a query for keying: case, whitespace, punctuation and stopwords are ignored.
+
+    Word order is kept. A query made only of stopwords keeps them.
+    """
+    words = _PUNCTUATION.sub(" ", _JOINED.sub("", query.lower())).split()
+    return " ".join([w for w in words if w not in STOPWORDS] or words)
+
+
+def query_key(query: str) -> str:
+    """Cache key for a query: the SHA-1 of its canonical form."""
+    return hashlib.sha1(canonical_query(query).encode()).hexdigest()
+
+
+def _raw_key(query: str) -> str:
+    # What the old one-file-per-query cache (and the first SQLite cache) keyed on
+    return hashlib.sha1(query.encode()).hexdigest()
+
+
+class SearchCache:
+    """Search results in one SQLite file, fronted by an in-memory LRU.
+
+    Every entry expires ttl seconds after it was fetched. Once the stored
+    results exceed max_bytes, the least recently read are evicted. The database
+    runs in WAL mode with a busy timeout and writes in IMMEDIATE transactions,
+    so several debate processes can share one cache file safely.
+
+    On first open, any legacy cache/*.json files (one per query) are imported
+    once, each with a full ttl from the import; they can be deleted afterwards.
+
+    fetch() coalesces concurrent lookups of the same key within the process:
+    one caller fetches while the rest wait for its results. Reads, from memory
+    or the file, note the entry's access time; the times are written in
+    batches. Results found under a fallback (legacy) key are moved to the
+    first key.
+    """
+
+    def __init__(self, path: str | Path, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES, legacy_dir: str | Path | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[list[dict], float]] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._touched: dict[str, float] = {}
+        self._db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=30000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS searches ("
+            " key TEXT PRIMARY KEY, query TEXT, results TEXT NOT NULL, size INTEGER NOT NULL,"
+            " fetched REAL NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS searches_accessed ON searches (accessed)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.evictions = 0
+        if legacy_dir is not None:
+            self._import_legacy(Path(legacy_dir))
+
+    def _import_legacy(self, legacy_dir: Path):
+        files = sorted(legacy_dir.glob("*.json"))
+        if not files:
+            return
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._db.execute(
+                    "SELECT value FROM meta WHERE name = 'legacy_imported'").fetchone()
+                if done:
+                    self._db.execute("COMMIT")
+                    return
+                imported = 0
+                now = time.time()
+                for f in files:
+                    try:
+                        value = json.dumps(json.loads(f.read_text(encoding="utf-8")),
+                                           ensure_ascii=False)
+                    except (OSError, ValueError):
+                        continue
+                    # The TTL starts now, not at the file's mtime: most of an old cache
+                    # would otherwise arrive expired and be deleted by the first put().
+                    fetched = f.stat().st_mtime
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO searches VALUES (?, NULL, ?, ?, ?, ?, ?)",
+                        (f.stem, value, len(value), fetched, now + self.ttl, fetched),
+                    )
+                    imported += 1
+                self._db.execute("INSERT INTO meta VALUES ('legacy_imported', ?)", (str(time.time()),))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        print(f"[Search cache: imported {imported} legacy {legacy_dir.name}/*.json files into "
+              f"{self.path.name}; the .json files can now be deleted]")
+
+    def _remember(self, key: str, results: list[dict], expires: float):
+        self._memory[key] = (results, expires)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key: str, now: float):
+        # Caller holds the lock
+        self._touched[key] = now
+        if len(self._touched) >= TOUCH_BATCH:
+            self._flush()
+
+    def _flush(self):
+        # Caller holds the lock
+        if not self._touched:
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_touched()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _write_touched(self):
+        # Caller holds the lock, inside a write transaction
+        self._db.executemany("UPDATE searches SET accessed = ? WHERE key = ?",
+                             [(t, k) for k, t in self._touched.items()])
+        self._touched.clear()
+
+    def _lookup(self, keys: tuple[str, ...]) -> list[dict] | None:
+        # Caller holds the lock. Results found under a fallback key are moved to the first.
+        now = time.time()
+        entry = self._memory.get(keys[0])
+        if entry is not None and entry[1] > now:
+            self._memory.move_to_end(keys[0])
+            self._touch(keys[0], now)
+            return entry[0]
+        self._memory.pop(keys[0], None)
+        for key in keys:
+            row = self._db.execute("SELECT query, results, fetched, expires FROM searches "
+                                   "WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                continue
+            query, value, fetched, expires = row
+            if expires <= now:
+                self.expired += 1
+                continue
+            if key != keys[0]:
+                self._rekey(key, keys[0], row, now)
+            else:
+                self._touch(key, now)
+            results = json.loads(value)
+            self._remember(keys[0], results, expires)
+            return results
+        return None
+
+    def _rekey(self, old: str, new: str, row: tuple, now: float):
+        # Caller holds the lock
+        query, value, fetched, expires = row
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (new, query, value, len(value), fetched, expires, now),
+            )
+            self._db.execute("DELETE FROM searches WHERE key = ?", (old,))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str, *fallback_keys: str) -> list[dict] | None:
+        """Cached results for key, else for the first fallback key that has some."""
+        with self._lock:
+            results = self._lookup((key, *fallback_keys))
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return results
+
+    def fetch(self, key: str, query: str, load, *fallback_keys: str) -> list[dict]:
+        """Cached results for key, else load() them once however many threads ask."""
+        with self._lock:
+            results = self._lookup((key, *fallback_keys))
+            if results is not None:
+                self.hits += 1
+                return results
+            flight = self._inflight.get(key)
+            waiting = flight is not None
+            if waiting:
+                self.coalesced += 1
+            else:
+                flight = self._inflight[key] = Future()
+                self.misses += 1
+        if waiting:
+            return flight.result()
+        try:
+            results = load()
+            self.put(key, query, results)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            flight.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+        flight.set_result(results)
+        return results
+
+    def put(self, key: str, query: str, results: list[dict], ttl: float | None = None):
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        value = json.dumps(results, ensure_ascii=False)
+        with self._lock:
+            self._remember(key, results, expires)
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_touched()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, query, value, len(value), now, expires, now),
+                )
+                self._evict(now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float):
+        # Totals are read inside the write transaction, so they include other processes' writes.
+        self._db.execute("DELETE FROM searches WHERE expires <= ?", (now,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM searches").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._db.execute(
+                "SELECT key, size FROM searches ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM searches WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM searches").fetchone()
+        return {
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "coalesced": self.coalesced,
+            "expired":   self.expired,
+            "evictions": self.evictions,
+            "entries":   entries,
+            "bytes":     size,
+        }
+
+    def flush(self):
+        """Write the access times of reads since the last write."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+
+_cache: SearchCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Return the process-wide search cache, opening cache/search.sqlite on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(_CACHE_DIR / _DB_NAME, legacy_dir=_CACHE_DIR)
+        return _cache
+
+
+def set_search_cache(cache: SearchCache) -> None:
+    global _cache
+    _cache = cache
+
+
+def configure_search_cache(settings: dict | None = None) -> SearchCache:
+    """Open the process-wide search cache from a YAML `search:` block, e.g.
+
+        search:
+          ttl_days: 30
+          max_mb: 64
+          memory_entries: 512
+    """
+    settings = settings or {}
+    unknown = set(settings) - {"ttl_days", "max_mb", "memory_entries"}
+    if unknown:
+        raise ValueError(f"Unknown search: setting(s): {', '.join(sorted(unknown))}")
+    cache = SearchCache(
+        _CACHE_DIR / _DB_NAME,
+        ttl=settings.get("ttl_days", DEFAULT_TTL / 86400) * 86400,
+        max_bytes=int(settings.get("max_mb", DEFAULT_MAX_BYTES / 1024 / 1024) * 1024 * 1024),
+        memory_entries=settings.get("memory_entries", DEFAULT_MEMORY_ENTRIES),
+        legacy_dir=_CACHE_DIR,
+    )
+    set_search_cache(cache)
+    return cache
 
 
 def search_web(query: str, max_results: int = 4) -> list[dict]:
-    """Search DuckDuckGo, with a file-based cache keyed on the query string."""
-    _CACHE_DIR.mkdir(exist_ok=True)
-    cache_file = _CACHE_DIR / (hashlib.sha1(query.encode()).hexdigest() + ".json")
-
-    if cache_file.exists():
-        return json.loads(cache_file.read_text(encoding="utf-8"))
-
-    with DDGS() as ddgs:
-        raw = list(ddgs.text(query, max_results=max_results))
-    results = [{"title": r["title"], "url": r["href"], "snippet": r["body"]} for r in raw]
-    cache_file.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
-    return results
+    """Search DuckDuckGo, with results cached by canonical query (see SearchCache).
+
+    Queries differing only in case, spacing, punctuation or stopwords share
+    one cache entry, and concurrent identical searches share one request.
+    """
+    def _load():
+        with DDGS() as ddgs:
+            raw = list(ddgs.text(query, max_results=max_results))
+        return [{"title": r["title"], "url": r["href"], "snippet": r["body"]} for r in raw]
+
+    with span("search_web", "search", query=query):
+        return get_search_cache().fetch(query_key(query), query, _load, _raw_key(query))
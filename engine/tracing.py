@@ -0,0 +1,96 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+# The timeline row that spans started in this task or thread land on. Tasks and
+# asyncio.to_thread() copy the context, so work started from a debate stays on
+# that debate's track unless it names a sub-track of its own.
+_track: contextvars.ContextVar[str] = contextvars.ContextVar("trace_track", default="main")
+
+_NO_SPAN = nullcontext()
+
+
+class Tracer:
+    """Collects timed spans and writes them in Chrome trace event format.
+
+    The file opens in chrome://tracing or https://ui.perfetto.dev. Each track
+    (a debate, or one agent within it) is shown as its own thread row, so
+    overlapping async work doesn't have to nest.
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._events: list[dict] = []
+        self._tids: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _tid(self, track: str) -> int:
+        with self._lock:
+            tid = self._tids.get(track)
+            if tid is None:
+                tid = self._tids[track] = len(self._tids) + 1
+                self._events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                                     "tid": tid, "args": {"name": track}})
+            return tid
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args):
+        tid = self._tid(_track.get())
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            event = {
+                "name": name,
+                "cat":  cat,
+                "ph":   "X",
+                "ts":   round((started - self._start) * 1e6, 1),
+                "dur":  round((ended - started) * 1e6, 1),
+                "pid":  os.getpid(),
+                "tid":  tid,
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self._events.append(event)
+
+    def save(self, path: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            events = list(self._events)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}),
+                        encoding="utf-8")
+
+
+_tracer: Tracer | None = None
+
+
+def enable_tracing() -> Tracer:
+    """Start recording spans process-wide; until then span() costs next to nothing."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def span(name: str, cat: str = "debate", **args):
+    """Context manager timing a block as one span on the current track."""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, cat, **args)
+
+
+@contextmanager
+def track(name: str):
+    """Put spans started inside the block on their own track, nested under the current one."""
+    parent = _track.get()
+    token = _track.set(name if parent == "main" else f"{parent} / {name}")
+    try:
+        yield
+    finally:
+        _track.reset(token)
@@ -1,20 +1,31 @@
 import argparse
+import asyncio
 import os
-import random
 from datetime import datetime
 
 import yaml
-from engine.agent_pool import make_picker, setup_model_selection
-from engine.debate import run_debate
+from engine.agent_pool import make_config_picker, setup_model_selection
+from engine.agents import Agent
+from engine.backend import get_backend
+from engine.cli import add_backend_args, report_backend, setup_backend
+from engine.debate import DebateTimeout, run_debate_async
+from engine.dispatch import OVERFLOW_POLICIES
+from engine.prewarm import DEFAULT_CONCURRENCY, past_queries, prewarm, record_searches, seed_queries
+from engine.scheduler import RunPlan, count_loads, sample_runs, schedule
+from engine.search import get_search_cache
+from engine.tracing import enable_tracing, span, track
+from outputs.buffered import BufferedOutput
 from outputs.collector import ResultCollector
 from outputs.console import TerminalOutput
 from outputs.csv_export import SummaryCsv
 from outputs.html import HtmlOutput
+from outputs.rows import RowStore
 from outputs.summary import SummaryHtml
 from outputs.terminal_stats import TerminalStats
 
 DEFAULT_TURNS = 6
 DEFAULT_LINE_WIDTH = 80
+RESULTS_DIR = "results"
 
 
 def parse_args():
@@ -24,40 +35,97 @@ def parse_args():
                         help="Number of debate runs (default: 5)")
     parser.add_argument("--model", default=None,
                         help="Force all agents to use this Ollama model (default: random per agent)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of debates to keep in flight at once (default: 1)")
+    parser.add_argument("--judging", choices=["full", "fast"], default=None,
+                        help="fast: the judge scores each turn and gives its verdict in single "
+                             "schema-constrained calls (default: the config's judging, else full)")
+    parser.add_argument("--deadline", type=float, default=None, metavar="SECONDS",
+                        help="Cancel a debate that runs longer than this and record it as timed "
+                             "out (default: the config's deadline, else none)")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record a timeline of debate phases, model calls, searches and "
+                             "output writes to trace.json in the run directory "
+                             "(open in chrome://tracing or ui.perfetto.dev)")
+    parser.add_argument("--model-affinity", action="store_true",
+                        help="Reorder runs so consecutive debates reuse models Ollama already "
+                             "has loaded (the random draws are unchanged)")
+    parser.add_argument("--resident-models", type=int, default=1,
+                        help="How many models fit in GPU memory at once, for --model-affinity "
+                             "(default: 1)")
+    parser.add_argument("--prewarm", action="store_true",
+                        help="With web_research, fill the search cache before the debates start: "
+                             "the topic, premise and positions, plus the queries earlier batches "
+                             "of this config searched for most")
+    parser.add_argument("--prewarm-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Searches in flight at once while pre-warming (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--output-overflow", choices=OVERFLOW_POLICIES, default="block",
+                        help="What to do when an output falls behind the debate: block waits "
+                             "for it, drop-deltas skips streamed fragments (default: block)")
+    add_backend_args(parser)
     return parser.parse_args()
 
 
-def run_one(run_num: int, total: int, config: dict, run_dir: str, config_stem: str, pick) -> dict:
-    """Run a single debate and return the result row dict."""
-    print(f"\n{'=' * 60}")
-    print(f"  RUN {run_num} of {total}")
-    print(f"{'=' * 60}\n")
+async def run_one(plan: RunPlan, total: int, config: dict, run_dir: str, config_stem: str,
+                  buffer_terminal: bool = False, deadline: float = None,
+                  overflow: str = "block") -> dict:
+    """Run a single debate and return the result row dict.
 
-    debater_for     = pick(config["for"],      side="for")
-    debater_against = pick(config["against"],  side="against")
-    judge           = pick(config["audience"]) if "audience" in config else None
+    With buffer_terminal set, console output is held back and printed in one
+    block when the debate ends, so concurrent runs don't interleave. A debate
+    that passes its deadline, or whose model call times out for good, is
+    recorded as timed out with no winner.
+    """
+    run_num = plan.run_num
+    banner = f"\n{'=' * 60}\n  RUN {run_num} of {total}\n{'=' * 60}\n"
+    terminal = TerminalOutput(line_width=config.get("line_width", DEFAULT_LINE_WIDTH))
+    if buffer_terminal:
+        terminal = BufferedOutput(terminal)
+    else:
+        print(banner)
+
+    debater_for     = Agent(plan.cfg_for)
+    debater_against = Agent(plan.cfg_against)
+    judge           = Agent(plan.cfg_judge) if plan.cfg_judge else None
 
     debaters = [debater_for, debater_against]
-    random.shuffle(debaters)
+    if not plan.for_first:
+        debaters.reverse()
     first_speaker = debaters[0].name
 
     run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    html_path = f"{run_dir}/{config_stem}_{run_timestamp}.html"
+    html_path = f"{run_dir}/{config_stem}_{run_timestamp}_{run_num:03d}.html"
 
+    html = HtmlOutput(html_path)
     collector = ResultCollector()
-    run_debate(
-        debaters[0],
-        debaters[1],
-        topic=config["topic"],
-        premise=config.get("premise"),
-        turns=config.get("turns", DEFAULT_TURNS),
-        judge=judge,
-        outputs=[
-            TerminalOutput(line_width=config.get("line_width", DEFAULT_LINE_WIDTH)),
-            HtmlOutput(html_path),
-            collector,
-        ],
-    )
+    timed_out: TimeoutError | None = None
+    try:
+        await run_debate_async(
+            debaters[0],
+            debaters[1],
+            topic=config["topic"],
+            premise=config.get("premise"),
+            turns=config.get("turns", DEFAULT_TURNS),
+            judge=judge,
+            outputs=[
+                terminal,
+                html,
+                collector,
+            ],
+            deadline=deadline,
+            overflow=overflow,
+        )
+    except TimeoutError as e:
+        timed_out = e
+    finally:
+        html.close()
+        if buffer_terminal:
+            print(banner)
+            terminal.flush()
+
+    if timed_out:
+        reason = "deadline" if isinstance(timed_out, DebateTimeout) else "model call"
+        print(f"\n[Run {run_num} timed out ({reason}): {timed_out}]")
 
     print(f"\nTranscript: {html_path}")
 
@@ -75,52 +143,137 @@ def run_one(run_num: int, total: int, config: dict, run_dir: str, config_stem: s
         "model_for":           debater_for.model,
         "model_against":       debater_against.model,
         "model_judge":         judge.model if judge else None,
+        "judge_json_calls":    collector.json_calls,
+        "judge_json_retries":  collector.json_retries,
+        "timed_out":           timed_out is not None,
+        "metrics":             collector.metrics,
+        "searches":            collector.searches,
     }
 
 
+async def _prewarm(args, config: dict, config_stem: str):
+    if not config.get("web_research"):
+        print("[--prewarm skipped: the config doesn't use web_research]\n")
+        return
+    cache = get_search_cache()
+    before = cache.stats()
+    queries = seed_queries(config) + past_queries(RESULTS_DIR, config_stem)
+    print(f"Pre-warming the search cache with up to {len(queries)} queries...")
+    result = await prewarm(queries, args.prewarm_concurrency)
+    after = cache.stats()
+    print(f"Pre-warm: {result['queries']} queries, {after['hits'] - before['hits']} already cached, "
+          f"{after['misses'] - before['misses'] - result['failed']} fetched, "
+          f"{result['failed']} failed\n")
+
+
+async def run_batch(args, config: dict, run_dir: str, config_stem: str, plans: list[RunPlan],
+                    store: RowStore, stats_outputs: list):
+    """Run the planned debates in order, keeping up to args.concurrency of them in flight.
+
+    Each finished run's row goes into store, then to each of stats_outputs in
+    a worker thread.
+    """
+    semaphore = asyncio.Semaphore(args.concurrency)
+    buffer_terminal = args.concurrency > 1
+    adding = asyncio.Lock()   # one row at a time through the outputs, in completion order
+
+    def _add_row(row: dict):
+        for out in stats_outputs:
+            with span(f"{type(out).__name__}.add_row", "output"):
+                out.add_row(row)
+
+    async def _run(plan: RunPlan):
+        with track(f"run {plan.run_num}"):
+            async with semaphore:
+                try:
+                    row = await run_one(plan, args.count, config, run_dir, config_stem,
+                                        buffer_terminal=buffer_terminal,
+                                        deadline=args.deadline or config.get("deadline"),
+                                        overflow=args.output_overflow)
+                except Exception as e:
+                    print(f"\n[Run {plan.run_num} failed: {e}] Skipping.\n")
+                    return
+            try:
+                record_searches(run_dir, plan.run_num, row["searches"])
+            except OSError as e:
+                print(f"\n[Run {plan.run_num}: couldn't record its searches: {e}]\n")
+            store.add(row)
+            # CSV fsyncs and summary renders run off the loop so other debates keep going
+            async with adding:
+                await asyncio.to_thread(_add_row, row)
+
+    try:
+        if args.prewarm:
+            await _prewarm(args, config, config_stem)
+        await asyncio.gather(*(_run(plan) for plan in plans))
+    finally:
+        await get_backend().aclose()
+
+
 def main():
     args = parse_args()
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1")
+    if args.resident_models < 1:
+        raise SystemExit("--resident-models must be at least 1")
+    if args.prewarm_concurrency < 1:
+        raise SystemExit("--prewarm-concurrency must be at least 1")
 
     with open(args.config, "r") as f:
         config = yaml.safe_load(f)
 
+    tracer = enable_tracing() if args.trace else None
+    backend_setup = setup_backend(args, config)
     available_models = setup_model_selection(args.model)
-    pick = make_picker(args.model, available_models, web_research=config.get("web_research", False))
+    pick_config = make_config_picker(args.model, available_models,
+                                     web_research=config.get("web_research", False),
+                                     history=config.get("history"),
+                                     judging=args.judging or config.get("judging"))
+    plans = sample_runs(config, args.count, pick_config)
 
     config_stem = os.path.splitext(os.path.basename(args.config))[0]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_dir = f"results/{config_stem}_{timestamp}"
+    run_dir = f"{RESULTS_DIR}/{config_stem}_{timestamp}"
     summary_path = f"{run_dir}/summary.html"
     csv_path = f"{run_dir}/results.csv"
 
+    concurrency_tag = f"  [{args.concurrency} concurrent]" if args.concurrency > 1 else ""
     if args.model:
-        print(f"Running {args.count} debate(s) from {args.config}  [model: {args.model}]")
+        print(f"Running {args.count} debate(s) from {args.config}  [model: {args.model}]{concurrency_tag}")
     elif available_models:
         print(f"Running {args.count} debate(s) from {args.config}  "
-              f"[random model from {len(available_models)} installed]")
+              f"[random model from {len(available_models)} installed]{concurrency_tag}")
     else:
-        print(f"Running {args.count} debate(s) from {args.config}")
+        print(f"Running {args.count} debate(s) from {args.config}{concurrency_tag}")
+    if args.model_affinity:
+        turns = config.get("turns", DEFAULT_TURNS)
+        loads_before = count_loads(plans, turns, args.resident_models)
+        plans = schedule(plans, turns, args.resident_models)
+        loads_after = count_loads(plans, turns, args.resident_models)
+        print(f"Model affinity: ~{loads_after} model loads instead of ~{loads_before} "
+              f"(saves ~{loads_before - loads_after})")
     print(f"Output:  {run_dir}/\n")
 
+    store = RowStore()
     stats_outputs = [
-        SummaryHtml(summary_path, title=config.get("premise", config.get("topic", config_stem))),
-        SummaryCsv(csv_path),
-        TerminalStats(),
+        SummaryHtml(summary_path, title=config.get("premise", config.get("topic", config_stem)),
+                    store=store),
+        SummaryCsv(csv_path, store=store),
+        TerminalStats(store=store),
     ]
 
-    for run_num in range(1, args.count + 1):
-        try:
-            row = run_one(run_num, args.count, config, run_dir, config_stem, pick)
-        except Exception as e:
-            print(f"\n[Run {run_num} failed: {e}] Skipping.\n")
-            continue
-        for out in stats_outputs:
-            out.add_row(row)
+    asyncio.run(run_batch(args, config, run_dir, config_stem, plans, store, stats_outputs))
 
     print(f"\nAll done! Output: {run_dir}/")
+    report_backend(backend_setup)
 
     for out in stats_outputs:
-        out.finalize()
+        with span(f"{type(out).__name__}.finalize", "output"):
+            out.finalize()
+
+    if tracer:
+        tracer.save(f"{run_dir}/trace.json")
+        print(f"Trace: {run_dir}/trace.json")
 
 
 if __name__ == "__main__":
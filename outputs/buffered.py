@@ -0,0 +1,23 @@
+from engine.events import DELTA_TYPES, DebateEvent, subscriptions
+
+
+class BufferedOutput:
+    """Holds events for a wrapped output and replays them in one go on flush().
+
+    Used when several debates share one terminal: each debate's stream is
+    printed whole once it finishes instead of interleaving line by line.
+    Streamed deltas are not kept; the complete THINK/TURN events carry the text.
+    """
+
+    def __init__(self, target):
+        self._target = target
+        self.subscribes = subscriptions(target) - DELTA_TYPES
+        self._events: list[DebateEvent] = []
+
+    def __call__(self, event: DebateEvent):
+        self._events.append(event)
+
+    def flush(self):
+        for event in self._events:
+            self._target(event)
+        self._events.clear()
@@ -4,6 +4,8 @@ from engine.events import DebateEvent, EventType
 class ResultCollector:
     """Lightweight output strategy that captures structured result data."""
 
+    subscribes = frozenset({EventType.HEADER, EventType.SEARCH, EventType.VERDICT, EventType.METRICS})
+
     def __init__(self):
         self.winner: str | None = None
         self.scores: dict = {}
@@ -11,9 +13,17 @@ class ResultCollector:
         self.premise_upheld: bool | None = None
         self.sides: dict = {}
         self.judge: str | None = None
+        self.json_calls: int | None = None
+        self.json_retries: int | None = None
+        self.metrics: list[dict] = []   # METRICS metadata, one per model call
+        self.searches: list[str] = []   # web search queries, in order
 
     def __call__(self, event: DebateEvent):
-        if event.type == EventType.HEADER:
+        if event.type == EventType.METRICS:
+            self.metrics.append(event.metadata)
+        elif event.type == EventType.SEARCH:
+            self.searches.append(event.content)
+        elif event.type == EventType.HEADER:
             self.sides = event.metadata.get("sides", {})
             self.premise = event.metadata.get("premise")
             judge_meta = event.metadata.get("judge")
@@ -22,3 +32,5 @@ class ResultCollector:
             self.winner = event.metadata.get("winner")
             self.scores = event.metadata.get("scores", {})
             self.premise_upheld = event.metadata.get("premise_upheld")
+            self.json_calls = event.metadata.get("json_calls")
+            self.json_retries = event.metadata.get("json_retries")
@@ -1,20 +1,100 @@
+import sys
 import textwrap
 from colorama import Fore, Style, init as colorama_init
-from engine.events import DebateEvent, EventType
+from engine.events import ALL_EVENTS, STREAM_OF, DebateEvent, EventType
 
 colorama_init()
 
 
+class _LiveStream:
+    """Word-wraps streamed text to stdout as it arrives.
+
+    Mirrors the layout of TerminalOutput._print_thought/_print_turn: the prefix
+    on the first line, continuation lines indented to the leader width, and a
+    blank line between paragraphs.
+    """
+
+    def __init__(self, prefix: str, leader_width: int, line_width: int, style: str = ""):
+        self._indent = " " * leader_width
+        self._leader_width = leader_width
+        self._line_width = line_width
+        self._style = style
+        self._col = leader_width
+        self._word = ""
+        self._newlines = 0
+        self._line_empty = True
+        self._para_started = False
+        self._fed: list[str] = []
+        sys.stdout.write(f"{style}{prefix}")
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._fed)
+
+    def feed(self, text: str):
+        self._fed.append(text)
+        for ch in text:
+            if ch.isspace():
+                self._end_word()
+                if ch == "\n":
+                    self._newlines += 1
+            else:
+                self._word += ch
+        sys.stdout.flush()
+
+    def close(self):
+        self._end_word()
+        sys.stdout.write(f"{Style.RESET_ALL}\n\n")
+        sys.stdout.flush()
+
+    def _end_word(self):
+        if not self._word:
+            return
+        if self._newlines >= 2 and self._para_started:
+            sys.stdout.write(f"{Style.RESET_ALL}\n\n{self._style}{self._indent}")
+            self._col = self._leader_width
+            self._line_empty = True
+        self._newlines = 0
+        gap = 0 if self._line_empty else 1
+        if not self._line_empty and self._col + gap + len(self._word) > self._line_width:
+            sys.stdout.write(f"{Style.RESET_ALL}\n{self._style}{self._indent}")
+            self._col = self._leader_width
+            gap = 0
+        sys.stdout.write(" " * gap + self._word)
+        self._col += gap + len(self._word)
+        self._word = ""
+        self._line_empty = False
+        self._para_started = True
+
+
 class TerminalOutput:
+    subscribes = ALL_EVENTS - {EventType.METRICS}   # timings are summarised by TerminalStats
+
     def __init__(self, line_width: int = 80):
         self.line_width = line_width
         self._colors: dict = {}     # built from HEADER event
         self._seen_plan = False     # tracks whether planning phase occurred
         self._debate_started = False
+        self._stream: _LiveStream | None = None   # THINK/TURN currently streaming
+        self._stream_key: tuple | None = None     # (delta type, speaker) of that stream
 
     def __call__(self, event: DebateEvent):
         color = getattr(Fore, event.color.upper(), Fore.WHITE)
 
+        if event.type in (EventType.THINK_DELTA, EventType.TURN_DELTA):
+            self._print_delta(event, color)
+            return
+
+        # The complete event for a stream we've been printing just closes it off,
+        # unless the stream was cut short (drop-deltas): then it supplies the rest.
+        finished_stream = self._stream_key == (STREAM_OF.get(event.type), event.speaker)
+        if finished_stream and event.metadata.get("truncated"):
+            finished_stream = self._finish_stream(event.content)
+        self._close_stream()
+        if finished_stream:
+            return
+
         if event.type == EventType.HEADER:
             self._colors = {
                 name: getattr(Fore, col.upper(), Fore.WHITE)
@@ -49,6 +129,40 @@ class TerminalOutput:
                                 premise=event.metadata.get("premise"),
                                 premise_upheld=event.metadata.get("premise_upheld"))
 
+    def _print_delta(self, event: DebateEvent, color):
+        key = (event.type, event.speaker)
+        if self._stream_key != key:
+            self._close_stream()
+            name = event.speaker
+            if event.type == EventType.THINK_DELTA:
+                self._seen_plan = True
+                prefix = f"{color}{Style.DIM}[{name} thinks]{Style.RESET_ALL}{Style.DIM} "
+                self._stream = _LiveStream(prefix, len(name) + 10, self.line_width, Style.DIM)
+            else:
+                if self._seen_plan and not self._debate_started:
+                    print(f"{Style.BRIGHT}{'— ' * 30}{Style.RESET_ALL}\n")
+                    self._debate_started = True
+                prefix = f"{color}{Style.BRIGHT}{name.upper()}:{Style.RESET_ALL} "
+                self._stream = _LiveStream(prefix, len(name) + 2, self.line_width)
+            self._stream_key = key
+        self._stream.feed(event.content)
+
+    def _finish_stream(self, content: str) -> bool:
+        """Print the part of content the open stream missed; False if the stream
+        doesn't match the start of content, so the whole event should be printed."""
+        shown = self._stream.text.lstrip()
+        content = content.lstrip()
+        if not content.startswith(shown):
+            return False
+        self._stream.feed(content[len(shown):])
+        return True
+
+    def _close_stream(self):
+        if self._stream:
+            self._stream.close()
+        self._stream = None
+        self._stream_key = None
+
     def _print_header(self, event: DebateEvent):
         topic = event.metadata["topic"]
         premise = event.metadata.get("premise")
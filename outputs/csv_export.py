@@ -1,6 +1,12 @@
 import csv
+import io
+import os
 from pathlib import Path
 
+from outputs.files import write_atomic
+from outputs.rows import RowStore, RowStoreOutput
+from outputs.stats import run_metrics
+
 _FIELDS = [
     "run_num",
     "agent_for",
@@ -16,6 +22,15 @@ _FIELDS = [
     "winner_side",
     "score_for",
     "score_against",
+    "judge_json_calls",
+    "judge_json_retries",
+    "timed_out",
+    "model_calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "model_seconds",
+    "judge_seconds",
+    "tokens_per_s",
     "transcript_filename",
 ]
 
@@ -26,6 +41,7 @@ def _flatten(row: dict) -> dict:
     winner        = row.get("winner") or ""
     scores        = row.get("scores", {})
     upheld        = row.get("premise_upheld")
+    metrics       = run_metrics(row["metrics"]) if row.get("metrics") else {}
 
     if winner == agent_for:
         winner_side = "for"
@@ -49,28 +65,55 @@ def _flatten(row: dict) -> dict:
         "winner_side":        winner_side,
         "score_for":          scores.get(agent_for, ""),
         "score_against":      scores.get(agent_against, ""),
+        "judge_json_calls":   row.get("judge_json_calls", ""),
+        "judge_json_retries": row.get("judge_json_retries", ""),
+        "timed_out":          "TRUE" if row.get("timed_out") else "",
+        "model_calls":        metrics.get("calls", ""),
+        "prompt_tokens":      metrics.get("prompt_tokens", ""),
+        "completion_tokens":  metrics.get("completion_tokens", ""),
+        "model_seconds":      metrics.get("model_seconds", ""),
+        "judge_seconds":      metrics.get("judge_seconds", ""),
+        "tokens_per_s":       "" if metrics.get("tokens_per_s") is None else metrics["tokens_per_s"],
         "transcript_filename": row.get("transcript_filename") or "",
     }
 
 
-class SummaryCsv:
-    """Accumulates per-run result rows and rewrites the CSV after each run."""
+def _csv_line(values: dict | None = None) -> str:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=_FIELDS)
+    if values is None:
+        writer.writeheader()
+    else:
+        writer.writerow(values)
+    return buf.getvalue()
+
+
+class SummaryCsv(RowStoreOutput):
+    """Writes one CSV line per run as each run completes.
+
+    The header is written atomically and synced, so the CSV on disk always
+    starts with a complete header; each run then appends a single line.
+    """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, store: RowStore | None = None):
+        super().__init__(store)
         self._path = Path(path)
-        self.rows: list[dict] = []
+        self._started = False
 
     def add_row(self, row: dict) -> None:
-        self.rows.append(row)
-        self._flush()
+        super().add_row(row)
+        if not self._started:
+            self._write_header()
+        with self._path.open("a", newline="", encoding="utf-8") as f:
+            f.write(_csv_line(_flatten(row)))
+            f.flush()
+            os.fsync(f.fileno())
 
     def finalize(self) -> None:
-        pass  # already flushed incrementally after each add_row
+        if not self._started:
+            self._write_header()   # an empty batch still gets a CSV with a header
 
-    def _flush(self):
+    def _write_header(self):
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        with self._path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=_FIELDS)
-            writer.writeheader()
-            for row in self.rows:
-                writer.writerow(_flatten(row))
+        write_atomic(self._path, _csv_line(), sync=True)
+        self._started = True
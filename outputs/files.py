@@ -0,0 +1,15 @@
+import os
+from pathlib import Path
+
+
+def write_atomic(path: Path, text: str, sync: bool = False) -> None:
+    """Replace path with text via a temporary file renamed into place, so a reader
+    sees the old file or the new one, never half of one. With sync, the data
+    reaches the disk before the rename."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", newline="", encoding="utf-8") as f:
+        f.write(text)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
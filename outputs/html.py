@@ -4,6 +4,7 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 from markupsafe import Markup, escape
 
 from engine.events import DebateEvent, EventType
+from outputs.files import write_atomic
 
 # Colorama color names mapped to values that read well on a white background
 _CSS_COLOR = {
@@ -18,6 +19,7 @@ _CSS_COLOR = {
 }
 
 _TEMPLATE_DIR = Path(__file__).parent / "templates"
+_TRANSCRIPT_END = "<!-- transcript-end -->"
 
 _env = Environment(
     loader=FileSystemLoader(_TEMPLATE_DIR),
@@ -45,6 +47,17 @@ def _css(color_name: str) -> str:
 
 
 class HtmlOutput:
+    """Writes the debate transcript to an HTML file as the debate goes.
+
+    The page head goes to disk with the HEADER and each transcript entry is
+    appended as it arrives, so a half-finished transcript can be refreshed in a
+    browser. The verdict, or close() for a debate without one, replaces the
+    file with the finished page in one atomic rename.
+    """
+
+    subscribes = frozenset({EventType.HEADER, EventType.PLAN, EventType.THINK, EventType.SEARCH,
+                            EventType.TURN, EventType.SCORE, EventType.VERDICT})
+
     def __init__(self, path: str):
         self._path = Path(path)
         self._topic = ""
@@ -52,9 +65,12 @@ class HtmlOutput:
         self._participants: list[dict] = []   # {name, color, bio, side}
         self._colors: dict[str, str] = {}     # name -> CSS color
         self._judge: dict | None = None
-        self._events: list[dict] = []
+        self._fragments: list[str] = []       # rendered transcript entries, in order
         self._verdict: dict | None = None
+        self._started = False
+        self._finished = False
         self._template = _env.get_template("debate.html")
+        self._macros = self._template.module
 
     def __call__(self, event: DebateEvent):
         color = _css(event.color)
@@ -90,15 +106,15 @@ class HtmlOutput:
                 }
 
         elif event.type == EventType.PLAN:
-            self._events.append({"type": "plan", "speaker": event.speaker,
-                                  "color": color, "content": event.content})
+            self._append({"type": "plan", "speaker": event.speaker,
+                          "color": color, "content": event.content})
 
         elif event.type == EventType.THINK:
-            self._events.append({"type": "think", "speaker": event.speaker,
-                                  "color": color, "content": event.content})
+            self._append({"type": "think", "speaker": event.speaker,
+                          "color": color, "content": event.content})
 
         elif event.type == EventType.SEARCH:
-            self._events.append({
+            self._append({
                 "type": "search",
                 "speaker": event.speaker,
                 "color": color,
@@ -107,12 +123,12 @@ class HtmlOutput:
             })
 
         elif event.type == EventType.TURN:
-            self._events.append({"type": "turn", "speaker": event.speaker,
-                                  "color": color, "content": event.content})
+            self._append({"type": "turn", "speaker": event.speaker,
+                          "color": color, "content": event.content})
 
         elif event.type == EventType.SCORE:
             target = event.metadata["target"]
-            self._events.append({
+            self._append({
                 "type": "score",
                 "speaker": event.speaker,
                 "color": color,
@@ -133,17 +149,47 @@ class HtmlOutput:
                 "premise_upheld": event.metadata.get("premise_upheld"),
             }
 
-        self._flush()
+        if not self._started:
+            self._start()
+        if event.type == EventType.VERDICT or self._finished:
+            self._finish()
 
-    def _flush(self):
-        self._path.parent.mkdir(parents=True, exist_ok=True)
+    def _append(self, entry: dict):
+        fragment = str(self._macros.transcript_event(entry))
+        self._fragments.append(fragment)
+        if self._started and not self._finished:
+            with self._path.open("a", encoding="utf-8") as f:
+                f.write(fragment)
+
+    def _page(self) -> tuple[str, str]:
+        """The page around the transcript entries: (head, tail)."""
         html = self._template.render(
             topic=self._topic,
             premise=self._premise,
             participants=self._participants,
             judge=self._judge,
             colors=self._colors,
-            events=self._events,
+            events=[],
             verdict=self._verdict,
         )
-        self._path.write_text(html, encoding="utf-8")
+        head, tail = html.split(_TRANSCRIPT_END)
+        return head, _TRANSCRIPT_END + tail
+
+    def _write(self, html: str):
+        write_atomic(self._path, html)
+
+    def _start(self):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        head, _ = self._page()
+        self._write(head + "".join(self._fragments))
+        self._started = True
+
+    def _finish(self):
+        head, tail = self._page()
+        self._write(head + "".join(self._fragments) + tail)
+        self._finished = True
+
+    def close(self):
+        """Close off the page of a debate that ended without a verdict."""
+        if self._started and not self._finished:
+            self._finish()
@@ -0,0 +1,51 @@
+import threading
+
+from outputs.stats import StatsAccumulator
+
+
+class RowStore:
+    """The per-run result rows of a batch, shared by every stats output.
+
+    Rows are only ever appended. Running statistics are kept alongside, so
+    stats() costs the same however many rows there are.
+    """
+
+    def __init__(self):
+        self._rows: list[dict] = []
+        self._stats = StatsAccumulator()
+        self._lock = threading.Lock()
+
+    def add(self, row: dict) -> None:
+        with self._lock:
+            self._rows.append(row)
+            self._stats.add(row)
+
+    @property
+    def rows(self) -> list[dict]:
+        """A snapshot of the rows added so far, in order."""
+        with self._lock:
+            return list(self._rows)
+
+    def stats(self) -> dict:
+        """outputs.stats.compute() over every row added so far."""
+        with self._lock:
+            return self._stats.result()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class RowStoreOutput:
+    """Base for batch outputs that work from a RowStore's rows.
+
+    Pass the batch's shared store; without one, add_row() keeps rows in a
+    store of its own.
+    """
+
+    def __init__(self, store: RowStore | None = None):
+        self._owns_store = store is None
+        self.store = store if store is not None else RowStore()
+
+    def add_row(self, row: dict) -> None:
+        if self._owns_store:
+            self.store.add(row)
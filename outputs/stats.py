@@ -1,164 +1,275 @@
-def compute(rows: list[dict]) -> dict:
-    """Compute aggregate statistics from a list of per-run row dicts."""
-    completed = [r for r in rows if r.get("premise_upheld") is not None]
-    upheld    = [r for r in completed if r["premise_upheld"]]
-    rejected  = [r for r in completed if not r["premise_upheld"]]
-    overall_uphold_rate = len(upheld) / len(completed) if completed else None
-
-    # --- debater stats ---
-    _agents: dict = {}
-    for row in rows:
-        for side_key, name_key in [("for", "agent_for"), ("against", "agent_against")]:
-            name = row.get(name_key)
+def run_metrics(records: list[dict]) -> dict:
+    """Totals over one run's METRICS records (one per model call)."""
+    completion = sum(m.get("completion_tokens") or 0 for m in records)
+    generating = sum(m["latency"] - (m.get("ttft") or 0.0)
+                     for m in records if m.get("completion_tokens"))
+    return {
+        "calls":             len(records),
+        "prompt_tokens":     sum(m.get("prompt_tokens") or 0 for m in records),
+        "completion_tokens": completion,
+        "model_seconds":     round(sum(m["latency"] for m in records), 2),
+        "judge_seconds":     round(sum(m["latency"] for m in records if m.get("role") == "judge"), 2),
+        "tokens_per_s":      round(completion / generating, 1) if generating > 0 else None,
+    }
+
+
+def _bias(rate, overall):
+    return round(rate - overall, 3) if (rate is not None and overall is not None) else None
+
+
+def _verdict_profile(name: str, d: dict, overall_uphold_rate) -> dict:
+    comp = d["upheld"] + d["rejected"]
+    rate = d["upheld"] / comp if comp else None
+    return {
+        "name":        name,
+        "n":           d["n"],
+        "upheld":      d["upheld"],
+        "rejected":    d["rejected"],
+        "completed":   comp,
+        "uphold_rate": rate,
+        "bias":        _bias(rate, overall_uphold_rate),
+    }
+
+
+def _win_record(name: str, d: dict) -> dict:
+    return {
+        "name":      name,
+        "n":         d["n"],
+        "wins":      d["wins"],
+        "win_rate":  d["wins"] / d["n"] if d["n"] else None,
+        "avg_score": round(d["score_sum"] / d["score_n"], 1) if d["score_n"] else None,
+    }
+
+
+def _merge_counts(into: dict, other: dict, new):
+    """Add other's per-key counters into into's, keeping into's first-seen order."""
+    for key, d in other.items():
+        mine = into.setdefault(key, {**new(), **{k: v for k, v in d.items() if isinstance(v, str)}})
+        for k, v in d.items():
+            if not isinstance(v, str):
+                mine[k] += v
+
+
+class StatsAccumulator:
+    """Running totals behind compute(), updated in O(1) per row.
+
+    add() folds in one run's row; result() builds the same dict compute() returns
+    for every row added so far, in time proportional to the number of distinct
+    agents, judges and models rather than rows. merge() adds another
+    accumulator's totals, e.g. from a separate worker, as if its rows had been
+    added here after this one's.
+    """
+
+    def __init__(self, rows: list[dict] = ()):
+        self.total = 0
+        self.timed_out = 0
+        self.upheld = 0
+        self.rejected = 0
+        self._agents: dict = {}
+        self._judges: dict = {}
+        self._model_debaters: dict = {}
+        self._model_judges: dict = {}
+        self._order = {"n": 0, "first_wins": 0}
+        self._sides = {"n": 0, "for_wins": 0, "against_wins": 0}
+        self._structured = {"n": 0, "calls": 0, "retries": 0}
+        self._calls: dict = {}
+        for row in rows:
+            self.add(row)
+
+    @staticmethod
+    def _new_debater() -> dict:
+        return {"n": 0, "wins": 0, "score_sum": 0, "score_n": 0}
+
+    @staticmethod
+    def _new_judge() -> dict:
+        return {"n": 0, "upheld": 0, "rejected": 0}
+
+    @staticmethod
+    def _new_call() -> dict:
+        return {"n": 0, "latency": 0.0, "ttft_sum": 0.0, "ttft_n": 0,
+                "prompt": 0, "completion": 0, "generating": 0.0}
+
+    def add(self, row: dict) -> None:
+        upheld = row.get("premise_upheld")
+        winner = row.get("winner")
+        scores = row.get("scores", {})
+        self.total += 1
+        if row.get("timed_out"):
+            self.timed_out += 1
+        if upheld is not None:
+            if upheld:
+                self.upheld += 1
+            else:
+                self.rejected += 1
+
+        # --- debaters, by persona and by model ---
+        for side_key, name_key, model_key in [("for", "agent_for", "model_for"),
+                                              ("against", "agent_against", "model_against")]:
+            name  = row.get(name_key)
+            model = row.get(model_key)
+            score = scores.get(name)
+            if name:
+                if name not in self._agents:
+                    self._agents[name] = {**self._new_debater(), "side": side_key}
+                self._add_debater(self._agents[name], winner == name, score)
+            if model:
+                if model not in self._model_debaters:
+                    self._model_debaters[model] = self._new_debater()
+                self._add_debater(self._model_debaters[model], winner == name, score)
+
+        # --- judges, by persona and by model ---
+        for key, table in [("judge", self._judges), ("model_judge", self._model_judges)]:
+            name = row.get(key)
             if not name:
                 continue
-            if name not in _agents:
-                _agents[name] = {"n": 0, "wins": 0, "score_sum": 0, "score_n": 0, "side": side_key}
-            d = _agents[name]
+            if name not in table:
+                table[name] = self._new_judge()
+            d = table[name]
             d["n"] += 1
-            if row.get("winner") == name:
-                d["wins"] += 1
-            s = row.get("scores", {}).get(name)
-            if s is not None:
-                d["score_sum"] += s
-                d["score_n"]   += 1
-    agents = sorted([
-        {
-            "name": name,
-            "n":         d["n"],
-            "wins":      d["wins"],
-            "win_rate":  d["wins"] / d["n"] if d["n"] else None,
-            "avg_score": round(d["score_sum"] / d["score_n"], 1) if d["score_n"] else None,
-            "side":      d["side"],
-        }
-        for name, d in _agents.items()
-    ], key=lambda x: (x["win_rate"] or 0), reverse=True)
-
-    # --- judge stats ---
-    _judges: dict = {}
-    for row in rows:
-        judge = row.get("judge")
-        if not judge:
-            continue
-        if judge not in _judges:
-            _judges[judge] = {"n": 0, "upheld": 0, "rejected": 0}
-        d = _judges[judge]
+            if upheld is True:
+                d["upheld"]   += 1
+            elif upheld is False:
+                d["rejected"] += 1
+
+        # --- speaking order and side effect ---
+        if row.get("first_speaker") and winner:
+            self._order["n"] += 1
+            if winner == row["first_speaker"]:
+                self._order["first_wins"] += 1
+        if winner:
+            self._sides["n"] += 1
+            if winner == row.get("agent_for"):
+                self._sides["for_wins"] += 1
+            if winner == row.get("agent_against"):
+                self._sides["against_wins"] += 1
+
+        # --- judge structured-output retries ---
+        if row.get("judge_json_calls"):
+            self._structured["n"]       += 1
+            self._structured["calls"]   += row["judge_json_calls"]
+            self._structured["retries"] += row.get("judge_json_retries") or 0
+
+        # --- call metrics by model / role / phase ---
+        for m in row.get("metrics") or []:
+            key = (m.get("model"), m.get("role"), m.get("phase"))
+            if key not in self._calls:
+                self._calls[key] = self._new_call()
+            d = self._calls[key]
+            d["n"]       += 1
+            d["latency"] += m["latency"]
+            if m.get("ttft") is not None:
+                d["ttft_sum"] += m["ttft"]
+                d["ttft_n"]   += 1
+            d["prompt"] += m.get("prompt_tokens") or 0
+            if m.get("completion_tokens"):
+                d["completion"] += m["completion_tokens"]
+                d["generating"] += m["latency"] - (m.get("ttft") or 0.0)
+
+    @staticmethod
+    def _add_debater(d: dict, won: bool, score):
         d["n"] += 1
-        if row.get("premise_upheld") is True:
-            d["upheld"]   += 1
-        elif row.get("premise_upheld") is False:
-            d["rejected"] += 1
-    judges = []
-    for name, d in sorted(_judges.items(), key=lambda x: x[1]["n"], reverse=True):
-        comp = d["upheld"] + d["rejected"]
-        rate = d["upheld"] / comp if comp else None
-        bias = (rate - overall_uphold_rate) if (rate is not None and overall_uphold_rate is not None) else None
-        judges.append({
-            "name":        name,
-            "n":           d["n"],
-            "upheld":      d["upheld"],
-            "rejected":    d["rejected"],
-            "completed":   comp,
-            "uphold_rate": rate,
-            "bias":        round(bias, 3) if bias is not None else None,
-        })
-
-    # --- speaking order ---
-    order_rows = [r for r in rows if r.get("first_speaker") and r.get("winner")]
-    order = None
-    if order_rows:
-        first_wins  = sum(1 for r in order_rows if r["winner"] == r["first_speaker"])
-        second_wins = len(order_rows) - first_wins
-        n = len(order_rows)
-        order = {
-            "n":               n,
-            "first_wins":      first_wins,
-            "first_win_rate":  first_wins  / n,
-            "second_wins":     second_wins,
-            "second_win_rate": second_wins / n,
+        if won:
+            d["wins"] += 1
+        if score is not None:
+            d["score_sum"] += score
+            d["score_n"]   += 1
+
+    def merge(self, other: "StatsAccumulator") -> "StatsAccumulator":
+        """Fold in another accumulator's totals; returns self."""
+        self.total     += other.total
+        self.timed_out += other.timed_out
+        self.upheld    += other.upheld
+        self.rejected  += other.rejected
+        _merge_counts(self._agents, other._agents, self._new_debater)
+        _merge_counts(self._model_debaters, other._model_debaters, self._new_debater)
+        _merge_counts(self._judges, other._judges, self._new_judge)
+        _merge_counts(self._model_judges, other._model_judges, self._new_judge)
+        _merge_counts(self._calls, other._calls, self._new_call)
+        for mine, theirs in [(self._order, other._order), (self._sides, other._sides),
+                             (self._structured, other._structured)]:
+            for k, v in theirs.items():
+                mine[k] += v
+        return self
+
+    def result(self) -> dict:
+        """The statistics dict for every row added so far; see compute()."""
+        completed = self.upheld + self.rejected
+        overall_uphold_rate = self.upheld / completed if completed else None
+
+        agents = sorted([
+            {**_win_record(name, d), "side": d["side"]} for name, d in self._agents.items()
+        ], key=lambda x: (x["win_rate"] or 0), reverse=True)
+        model_debaters = sorted([
+            _win_record(model, d) for model, d in self._model_debaters.items()
+        ], key=lambda x: (x["win_rate"] or 0), reverse=True)
+
+        judges = [_verdict_profile(name, d, overall_uphold_rate)
+                  for name, d in sorted(self._judges.items(), key=lambda x: x[1]["n"], reverse=True)]
+        model_judges = [_verdict_profile(name, d, overall_uphold_rate)
+                        for name, d in sorted(self._model_judges.items(),
+                                              key=lambda x: x[1]["n"], reverse=True)]
+
+        order = None
+        if self._order["n"]:
+            n = self._order["n"]
+            first_wins  = self._order["first_wins"]
+            second_wins = n - first_wins
+            order = {
+                "n":               n,
+                "first_wins":      first_wins,
+                "first_win_rate":  first_wins  / n,
+                "second_wins":     second_wins,
+                "second_win_rate": second_wins / n,
+            }
+
+        n = self._sides["n"]
+        sides = {
+            "n":            n,
+            "for_wins":     self._sides["for_wins"],
+            "for_win_rate": self._sides["for_wins"] / n if n else None,
+            "against_wins": self._sides["against_wins"],
+            "against_win_rate": self._sides["against_wins"] / n if n else None,
         }
 
-    # --- model debater stats ---
-    _model_debaters: dict = {}
-    for row in rows:
-        for model_key, name_key in [("model_for", "agent_for"), ("model_against", "agent_against")]:
-            model = row.get(model_key)
-            name  = row.get(name_key)
-            if not model:
-                continue
-            if model not in _model_debaters:
-                _model_debaters[model] = {"n": 0, "wins": 0, "score_sum": 0, "score_n": 0}
-            d = _model_debaters[model]
-            d["n"] += 1
-            if row.get("winner") == name:
-                d["wins"] += 1
-            s = row.get("scores", {}).get(name)
-            if s is not None:
-                d["score_sum"] += s
-                d["score_n"]   += 1
-    model_debaters = sorted([
-        {
-            "name":      model,
-            "n":         d["n"],
-            "wins":      d["wins"],
-            "win_rate":  d["wins"] / d["n"] if d["n"] else None,
-            "avg_score": round(d["score_sum"] / d["score_n"], 1) if d["score_n"] else None,
+        structured = None
+        if self._structured["n"]:
+            structured = {**self._structured,
+                          "retry_rate": self._structured["retries"] / self._structured["calls"]}
+
+        calls = sorted([
+            {
+                "model":             model,
+                "role":              role,
+                "phase":             phase,
+                "n":                 d["n"],
+                "total_s":           round(d["latency"], 1),
+                "avg_latency":       round(d["latency"] / d["n"], 2),
+                "avg_ttft":          round(d["ttft_sum"] / d["ttft_n"], 2) if d["ttft_n"] else None,
+                "prompt_tokens":     d["prompt"],
+                "completion_tokens": d["completion"],
+                "tokens_per_s":      round(d["completion"] / d["generating"], 1) if d["generating"] > 0 else None,
+            }
+            for (model, role, phase), d in self._calls.items()
+        ], key=lambda x: x["total_s"], reverse=True)
+
+        return {
+            "total":          self.total,
+            "timed_out":      self.timed_out,
+            "completed":      completed,
+            "upheld":         self.upheld,
+            "rejected":       self.rejected,
+            "uphold_rate":    overall_uphold_rate,
+            "agents":         agents,
+            "judges":         judges,
+            "model_debaters": model_debaters,
+            "model_judges":   model_judges,
+            "order":          order,
+            "sides":          sides,
+            "structured":     structured,
+            "calls":          calls,
         }
-        for model, d in _model_debaters.items()
-    ], key=lambda x: (x["win_rate"] or 0), reverse=True)
-
-    # --- model judge stats ---
-    _model_judges: dict = {}
-    for row in rows:
-        model = row.get("model_judge")
-        if not model:
-            continue
-        if model not in _model_judges:
-            _model_judges[model] = {"n": 0, "upheld": 0, "rejected": 0}
-        d = _model_judges[model]
-        d["n"] += 1
-        if row.get("premise_upheld") is True:
-            d["upheld"]   += 1
-        elif row.get("premise_upheld") is False:
-            d["rejected"] += 1
-    model_judges = []
-    for name, d in sorted(_model_judges.items(), key=lambda x: x[1]["n"], reverse=True):
-        comp = d["upheld"] + d["rejected"]
-        rate = d["upheld"] / comp if comp else None
-        bias = (rate - overall_uphold_rate) if (rate is not None and overall_uphold_rate is not None) else None
-        model_judges.append({
-            "name":        name,
-            "n":           d["n"],
-            "upheld":      d["upheld"],
-            "rejected":    d["rejected"],
-            "completed":   comp,
-            "uphold_rate": rate,
-            "bias":        round(bias, 3) if bias is not None else None,
-        })
-
-    # --- side effect ---
-    side_rows    = [r for r in rows if r.get("winner")]
-    for_wins     = sum(1 for r in side_rows if r.get("winner") == r.get("agent_for"))
-    against_wins = sum(1 for r in side_rows if r.get("winner") == r.get("agent_against"))
-    n = len(side_rows)
-    sides = {
-        "n":            n,
-        "for_wins":     for_wins,
-        "for_win_rate": for_wins     / n if n else None,
-        "against_wins": against_wins,
-        "against_win_rate": against_wins / n if n else None,
-    }
 
-    return {
-        "total":          len(rows),
-        "completed":      len(completed),
-        "upheld":         len(upheld),
-        "rejected":       len(rejected),
-        "uphold_rate":    overall_uphold_rate,
-        "agents":         agents,
-        "judges":         judges,
-        "model_debaters": model_debaters,
-        "model_judges":   model_judges,
-        "order":          order,
-        "sides":          sides,
-    }
+
+def compute(rows: list[dict]) -> dict:
+    """Compute aggregate statistics from a list of per-run row dicts."""
+    return StatsAccumulator(rows).result()
@@ -1,38 +1,55 @@
+import time
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from outputs import stats as stats_mod
+from outputs.files import write_atomic
+from outputs.rows import RowStore, RowStoreOutput
 
 _TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+DEFAULT_REFRESH = 30.0   # seconds between rewrites of the summary during a batch
+
 _env = Environment(
     loader=FileSystemLoader(_TEMPLATE_DIR),
     autoescape=select_autoescape(["html"]),
 )
 
 
-class SummaryHtml:
-    """Accumulates per-run result rows and rewrites the summary HTML after each run."""
+class SummaryHtml(RowStoreOutput):
+    """Renders the batch summary HTML from a RowStore.
+
+    The page is written for the first run and then at most every refresh
+    seconds as runs complete; finalize() writes the final version.
+    """
 
-    def __init__(self, path: str, title: str = ""):
+    def __init__(self, path: str, title: str = "", store: RowStore | None = None,
+                 refresh: float = DEFAULT_REFRESH):
+        super().__init__(store)
         self._path = Path(path)
         self._title = title
-        self.rows: list[dict] = []
+        self._refresh = refresh
+        self._written: float | None = None   # monotonic time of the last write
+        self._stale = False
         self._template = _env.get_template("summary.html")
 
     def add_row(self, row: dict) -> None:
-        self.rows.append(row)
-        self._flush()
+        super().add_row(row)
+        self._stale = True
+        if self._written is None or time.monotonic() - self._written >= self._refresh:
+            self._flush()
 
     def finalize(self) -> None:
-        pass  # already flushed incrementally after each add_row
+        if self._stale:
+            self._flush()
 
     def _flush(self):
         self._path.parent.mkdir(parents=True, exist_ok=True)
         html = self._template.render(
             title=self._title,
-            rows=self.rows,
-            stats=stats_mod.compute(self.rows),
+            rows=self.store.rows,
+            stats=self.store.stats(),
         )
-        self._path.write_text(html, encoding="utf-8")
+        write_atomic(self._path, html)
+        self._written = time.monotonic()
+        self._stale = False
@@ -1,4 +1,4 @@
-from outputs import stats as stats_mod
+from outputs.rows import RowStoreOutput
 
 
 def _bias_str(bias) -> str:
@@ -8,22 +8,20 @@ def _bias_str(bias) -> str:
     return f"{sign}{bias:.0%}"
 
 
-class TerminalStats:
-    """Accumulates per-run rows and prints a stats summary block on finalize()."""
-
-    def __init__(self):
-        self.rows: list[dict] = []
-
-    def add_row(self, row: dict) -> None:
-        self.rows.append(row)
+class TerminalStats(RowStoreOutput):
+    """Prints a statistics summary block for a RowStore's rows on finalize()."""
 
     def finalize(self) -> None:
-        s = stats_mod.compute(self.rows)
+        s = self.store.stats()
         sep = "=" * 60
         print(f"\n{sep}")
         print(f"  STATISTICS  ({s['total']} run{'s' if s['total'] != 1 else ''})")
         print()
 
+        if s["timed_out"]:
+            print(f"  Timed out: {s['timed_out']} run{'s' if s['timed_out'] != 1 else ''} (no verdict)")
+            print()
+
         if s["completed"]:
             rate = f"  ({s['uphold_rate']:.0%})" if s["uphold_rate"] is not None else ""
             print(f"  Premise result: {s['upheld']} upheld / {s['rejected']} rejected{rate}")
@@ -81,4 +79,21 @@ class TerminalStats:
             print(f"  AGAINST: {d['against_wins']} wins  ({against_pct})")
             print()
 
+        if s["calls"]:
+            print("  MODEL CALLS  (by total time)")
+            print(f"  {'Model':<22} {'Role':<8} {'Phase':<9} {'n':>4}  {'Total s':>7}  {'Avg s':>6}"
+                  f"  {'TTFT s':>6}  {'Tok/s':>6}")
+            for c in s["calls"]:
+                ttft = f"{c['avg_ttft']:.2f}"   if c["avg_ttft"]     is not None else "—"
+                tps  = f"{c['tokens_per_s']:.1f}" if c["tokens_per_s"] is not None else "—"
+                print(f"  {c['model']:<22} {c['role']:<8} {c['phase']:<9} {c['n']:>4}  {c['total_s']:>7.1f}"
+                      f"  {c['avg_latency']:>6.2f}  {ttft:>6}  {tps:>6}")
+            print()
+
+        if s["structured"]:
+            j = s["structured"]
+            print(f"  JUDGE JSON RETRIES  (n={j['n']} runs)")
+            print(f"  {j['retries']} retries / {j['calls']} structured calls  ({j['retry_rate']:.0%})")
+            print()
+
         print(sep)
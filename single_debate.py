@@ -5,7 +5,10 @@ from datetime import datetime
 
 import yaml
 from engine.agent_pool import make_picker, setup_model_selection
+from engine.cli import add_backend_args, report_backend, setup_backend
 from engine.debate import run_debate
+from engine.dispatch import OVERFLOW_POLICIES
+from engine.tracing import enable_tracing
 from outputs.console import TerminalOutput
 from outputs.html import HtmlOutput
 
@@ -17,13 +20,26 @@ parser.add_argument("config", nargs="?", default="debates/can_ai_think.yaml",
                     help="Path to the debate config YAML (default: debates/can_ai_think.yaml)")
 parser.add_argument("--model", default=None,
                     help="Force all agents to use this Ollama model (default: random per agent)")
+parser.add_argument("--judging", choices=["full", "fast"], default=None,
+                    help="fast: the judge scores each turn and gives its verdict in single "
+                         "schema-constrained calls (default: the config's judging, else full)")
+parser.add_argument("--trace", action="store_true",
+                    help="Record a timeline of debate phases, model calls, searches and output "
+                         "writes to a .trace.json beside the transcript")
+parser.add_argument("--output-overflow", choices=OVERFLOW_POLICIES, default="block",
+                    help="What to do when an output falls behind the debate: block waits for it, "
+                         "drop-deltas skips streamed fragments (default: block)")
+add_backend_args(parser)
 args = parser.parse_args()
 
 with open(args.config, "r") as f:
     config = yaml.safe_load(f)
 
+_tracer = enable_tracing() if args.trace else None
+_backend_setup = setup_backend(args, config)
 _available_models = setup_model_selection(args.model)
-_pick = make_picker(args.model, _available_models, web_research=config.get("web_research", False))
+_pick = make_picker(args.model, _available_models, web_research=config.get("web_research", False),
+                    history=config.get("history"), judging=args.judging or config.get("judging"))
 
 debater_for     = _pick(config["for"],      side="for")
 debater_against = _pick(config["against"],  side="against")
@@ -36,17 +52,27 @@ config_stem = os.path.splitext(os.path.basename(args.config))[0]
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 html_path = f"results/{config_stem}_{timestamp}.html"
 
-run_debate(
-    debaters[0],
-    debaters[1],
-    topic=config["topic"],
-    premise=config.get("premise"),
-    turns=config.get("turns", DEFAULT_TURNS),
-    judge=judge,
-    outputs=[
-        TerminalOutput(line_width=config.get("line_width", DEFAULT_LINE_WIDTH)),
-        HtmlOutput(html_path),
-    ],
-)
+html = HtmlOutput(html_path)
+try:
+    run_debate(
+        debaters[0],
+        debaters[1],
+        topic=config["topic"],
+        premise=config.get("premise"),
+        turns=config.get("turns", DEFAULT_TURNS),
+        judge=judge,
+        outputs=[
+            TerminalOutput(line_width=config.get("line_width", DEFAULT_LINE_WIDTH)),
+            html,
+        ],
+        overflow=args.output_overflow,
+    )
+finally:
+    html.close()
 
 print(f"\nHTML transcript saved to {html_path}")
+if _tracer:
+    trace_path = html_path.removesuffix(".html") + ".trace.json"
+    _tracer.save(trace_path)
+    print(f"Trace saved to {trace_path}")
+report_backend(_backend_setup)